@@ -1,12 +1,31 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 import requests
 import asyncio
 import json
 import httpx
-from scrapers.amazon_scraper import AmazonScraper
+import urllib.parse
+from contextlib import asynccontextmanager
 from scrapers.creative_scraper import CreativeScraper
-from pydantic import BaseModel
+from scrapers.fingerprint import DeltaTracker, ParseMemo
+from scrapers.hedging import Hedger
+from scrapers.image_cache import ImageCache, ImageUnavailable
+from scrapers.http_client import ClientManager
+from scrapers.metrics import metrics
+from scrapers.parse_executor import ParseExecutor
+from scrapers.rate_limiter import RateLimiter
+from scrapers.response_cache import ResponseCache
+from query_cache import QueryCache, normalize_query
+from exporter import export_catalog
+from jobs import PRIORITY_SCHEDULED, PRIORITY_USER, JobQueue, Scheduler, load_watchlist
+from product_store import ProductStore, export_json
+from data_processor import products_to_dicts, serialize_product
+from scrapers.registry import UnknownSourceError, resolve_sources
+from scrapers.selector_registry import SelectorRegistry
+from scrapers.selector_stats import SelectorStats
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 
 class SearchParams(BaseModel):
@@ -14,6 +33,24 @@ class SearchParams(BaseModel):
     category: str = "all"
     max_price: float
     sort_by: str = "relevant"  # options: relevant, price_low_to_high, price_high_to_low, highest_rating, most_popular
+    # crawl mode: keep fetching result pages until this many products match max_price
+    target_results: Optional[int] = None
+    max_pages: Optional[int] = None
+    # only return the first N products of the requested ordering (e.g. cheapest N)
+    limit: Optional[int] = None
+    # retailers to query (e.g. ["amazon"]); defaults to every enabled source
+    sources: Optional[List[str]] = None
+    # seconds to wait for retailers; slower ones are left out and listed as partial
+    deadline: Optional[float] = None
+
+class JobParams(SearchParams):
+    # PRIORITY_USER (first) .. PRIORITY_SCHEDULED (with the watchlist refreshes)
+    priority: int = Field(PRIORITY_USER, ge=PRIORITY_USER, le=PRIORITY_SCHEDULED)
+
+class BatchSearchParams(BaseModel):
+    queries: List[SearchParams]
+    # NDJSON frames per query as they finish instead of one response at the end
+    stream: bool = False
 
 # SORT_MAPPING = {
 #     "relevance": "relevant",
@@ -24,49 +61,199 @@ class SearchParams(BaseModel):
 # }
 
 output_filename = "products.json"
+# products.json is only an export for the static UI; the store is the record
+EXPORT_PRODUCTS_JSON = True
+# Paged shards + sort indexes the UI loads on demand (the manifest holds page one)
+EXPORT_CATALOG = True
+export_manifest_filename = "export/manifest.json"
+export_shard_dir = "../ui/public/products"
+product_store_filename = "products.db"
+selector_stats_filename = "selector_stats.json"
+selector_config_filename = "config/selector_config.json"
+response_cache_dir = ".cache/http"
+image_cache_dir = ".cache/images"
 
-app = FastAPI(title="Creative Scraper API")
+# Upper bound of pooled connections kept open per retailer host
+HOST_CONNECTION_LIMITS = {
+    "www.amazon.com": 20,
+}
 
+# Steady request rate (per second) and burst allowed per retailer host
+HOST_RATE_LIMITS = {
+    "www.amazon.com": (1.0, 3),
+}
 
-async def test_single_scraper(request_body: SearchParams):
-    """Test just the amazon scraper to make sure httpx works"""
-    scraper = AmazonScraper()
-    
-    # Simple test search
-    search_params = {
-        'search_input': request_body.search_input,
-        'category': request_body.category,
-        'max_price': request_body.max_price,
-        'sort_by': request_body.sort_by
-    }
-    
-    print("🧪 Testing Amazon scraper with httpx...")
-    
-    # Test the fetch_page method directly
-    test_url = "https://httpbin.org/user-agent"
-    html = await scraper.fetch_page(test_url)
-    if html:
-        print("✅ httpx is working! Retrieved test page.")
-        print("Content preview:", html[:100])
-    else:
-        print("❌ httpx test failed")
-    
-    # Test actual scraping
-    results = await scraper.scrape(search_params)
-    
-    print(f"\n📊 Results from {results['source']}:")
-    print(f"📦 Found {len(results['products'])} products")
-    
-    for i, product in enumerate(results['products'][:10], 1):
-        print(f"{i}. {product.get('title', 'No title')}")
-        print(f"   💰 {product.get('price', 'No price')}")
-        print(f"   🔗 {product.get('link', 'No link')}")
-        print("====================================================================")
-
-    products_data = results
-    with open(output_filename, "w") as json_file:
-        json.dump(products_data, json_file, indent=4)
-    
+# Where HTML parsing runs: "process" uses every core, "thread" avoids the
+# worker start-up cost; pages under the executor's inline threshold skip it
+PARSE_EXECUTOR_KIND = "process"
+
+# Extract products while result pages download, reading at most the page byte
+# budget; streamed pages bypass the response cache and the parse memo
+STREAM_PARSE = False
+
+# Seconds a fetched results page is served from the response cache before it
+# is revalidated with the retailer
+SOURCE_CACHE_TTLS = {
+    "amazon": 15 * 60,
+}
+
+# Searches from all batch requests running at once, and the largest batch accepted
+BATCH_CONCURRENCY = 8
+MAX_BATCH_QUERIES = 1000
+
+# Background scrape workers, and the queries they re-scrape on a schedule
+JOB_WORKERS = 4
+watchlist_filename = "config/watchlist.json"
+
+# Default time budget (seconds) of a multi-source search; retailers still
+# running then are cancelled and the search answers without them
+SCRAPE_DEADLINE = 20.0
+
+# A retailer failing this many searches in a row is skipped for the cooldown
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN = 60.0
+
+# Send a duplicate request when a fetch outlives its host's p95 latency
+HEDGE_REQUESTS = False
+
+# Product images are re-served from a local thumbnail cache instead of being
+# hot-linked; only these retailer image hosts are proxied. Thumbnail URLs in
+# the exports are relative: the UI dev server proxies /api to this app (see
+# ui/astro.config.mjs); use an absolute URL if the UI is hosted without one
+IMAGE_PROXY_URL = "/api/images"
+IMAGE_HOSTS = ("m.media-amazon.com", "images-na.ssl-images-amazon.com", "www.amazon.com")
+IMAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+IMAGE_DOWNLOAD_CONCURRENCY = 8
+# Thumbnails of a URL don't change, so browsers may keep them for 30 days
+IMAGE_CACHE_CONTROL = "public, max-age=2592000"
+
+# Record per-stage timings and counters for the /metrics endpoint; when off
+# the hooks in the scrapers return immediately
+METRICS_ENABLED = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    metrics.enabled = METRICS_ENABLED
+    # One set of keep-alive pools for the whole process, closed on shutdown
+    app.state.client_manager = ClientManager(host_limits=HOST_CONNECTION_LIMITS)
+    app.state.selector_stats = SelectorStats.load(selector_stats_filename)
+    # Validated and compiled up front; edits to the file are picked up live
+    app.state.selector_registry = SelectorRegistry(selector_config_filename)
+    app.state.response_cache = ResponseCache(response_cache_dir, ttls=SOURCE_CACHE_TTLS)
+    app.state.query_cache = QueryCache()
+    app.state.product_store = ProductStore(product_store_filename)
+    app.state.rate_limiter = RateLimiter(host_rates=HOST_RATE_LIMITS)
+    app.state.parse_executor = ParseExecutor(kind=PARSE_EXECUTOR_KIND)
+    app.state.parse_memo = ParseMemo()
+    app.state.delta_tracker = DeltaTracker()
+    app.state.background_tasks = set()
+    app.state.hedger = Hedger() if HEDGE_REQUESTS else None
+    app.state.image_cache = ImageCache(
+        image_cache_dir,
+        client_manager=app.state.client_manager,
+        max_bytes=IMAGE_CACHE_MAX_BYTES,
+        concurrency=IMAGE_DOWNLOAD_CONCURRENCY,
+        allowed_hosts=IMAGE_HOSTS,
+    )
+    app.state.scraper = CreativeScraper(
+        client_manager=app.state.client_manager,
+        selector_stats=app.state.selector_stats,
+        response_cache=app.state.response_cache,
+        rate_limiter=app.state.rate_limiter,
+        parse_executor=app.state.parse_executor,
+        parse_memo=app.state.parse_memo,
+        stream_parse=STREAM_PARSE,
+        selector_registry=app.state.selector_registry,
+        batch_concurrency=BATCH_CONCURRENCY,
+        deadline=SCRAPE_DEADLINE,
+        hedger=app.state.hedger,
+        breaker_threshold=BREAKER_FAILURE_THRESHOLD,
+        breaker_cooldown=BREAKER_COOLDOWN,
+    )
+    app.state.job_queue = JobQueue(run_search_job, workers=JOB_WORKERS)
+    app.state.scheduler = Scheduler(
+        app.state.job_queue, load_watchlist(watchlist_filename), last_scraped=app.state.product_store.last_scraped
+    )
+    app.state.job_queue.start()
+    app.state.scheduler.start()
+    try:
+        yield
+    finally:
+        await app.state.scheduler.stop()
+        await app.state.job_queue.stop()
+        await app.state.client_manager.aclose()
+        app.state.parse_executor.shutdown(wait=False)
+        app.state.product_store.close()
+        app.state.selector_stats.save(selector_stats_filename)
+
+
+app = FastAPI(title="Creative Scraper API", lifespan=lifespan)
+
+
+def check_sources(request_body: SearchParams):
+    """Reject unknown source names before any scraping starts"""
+    try:
+        resolve_sources(request_body.sources)
+    except UnknownSourceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def add_thumbnails(products):
+    """Point each product at its proxied thumbnails and cache them in the
+    background, so the listing doesn't hot-link full-size retailer images
+    (without Pillow there is nothing smaller to serve, so products are left as is)"""
+    image_cache = app.state.image_cache
+    if not image_cache.resizing:
+        # Every width would be the full-size original; let the UI use it directly
+        return
+    urls = []
+    for product in products:
+        image = product.get('image')
+        if not image or image == '#':
+            continue
+        try:
+            image_cache.check_url(image)
+        except ImageUnavailable:
+            continue
+        quoted = urllib.parse.quote(image, safe='')
+        product['thumbnails'] = {str(width): f"{IMAGE_PROXY_URL}?url={quoted}&w={width}" for width in image_cache.widths}
+        urls.append(image)
+    if urls:
+        task = asyncio.create_task(image_cache.warm(urls))
+        # Keep a reference so the warm-up isn't garbage collected mid-way
+        app.state.background_tasks.add(task)
+        task.add_done_callback(app.state.background_tasks.discard)
+
+
+async def run_search_job(search_params):
+    """Background job: scrape every source and keep the results in the store"""
+    products = await app.state.scraper.scrape_all(search_params)
+    await asyncio.to_thread(app.state.product_store.add_products, products, 'all', search_params)
+    # What changed since this query's previous job (added/removed/price or stock changes);
+    # a partial scrape would report the missing sources' products as removed
+    delta = None
+    if not products.partial:
+        delta = app.state.delta_tracker.update(normalize_query(search_params), products)
+    return {'products': products_to_dicts(products), 'count': len(products), 'delta': delta,
+            'partial': products.partial}
+
+
+async def run_search(search_params):
+    """Scrape the requested sources within the deadline, keep the results and
+    export them for the UI in the order the search answered with"""
+    products = await app.state.scraper.scrape_all(search_params)
+    await asyncio.to_thread(app.state.product_store.add_products, products, 'all', search_params)
+    records = products_to_dicts(products)
+    add_thumbnails(records)
+    results = {'products': records, 'count': len(records), 'sources': products.sources,
+               'partial': products.partial}
+    if EXPORT_PRODUCTS_JSON:
+        await asyncio.to_thread(export_json, output_filename, results)
+    if EXPORT_CATALOG:
+        await asyncio.to_thread(
+            export_catalog, records, export_shard_dir, export_manifest_filename, search_params
+        )
     return results
 
 async def test_httpbin():
@@ -98,12 +285,148 @@ async def test_httpbin():
 # fetch data from the frontend and return scraped results
 @app.post("/api/search")
 async def search_products(request_body: SearchParams):
-    return await test_single_scraper(request_body)
+    check_sources(request_body)
+    search_params = request_body.model_dump()
+    # Identical searches share one cached or in-flight scrape
+    key = normalize_query(search_params)
+    results, cache_status = await app.state.query_cache.get_or_compute(
+        key, lambda: run_search(search_params)
+    )
+    return {**results, 'cached': cache_status != 'miss', 'cache_status': cache_status}
+
+# stream products per source as NDJSON while the other retailers are still running
+@app.post("/api/search/stream")
+async def search_products_stream(request_body: SearchParams):
+    check_sources(request_body)
+    async def frames():
+        async for frame in app.state.scraper.scrape_stream(request_body.model_dump()):
+            yield json.dumps(frame, default=serialize_product) + "\n"
+
+    return StreamingResponse(frames(), media_type="application/x-ndjson")
+
+# run many searches through one shared scraper, budget and set of host limits
+@app.post("/api/search/batch")
+async def search_products_batch(request_body: BatchSearchParams):
+    if len(request_body.queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_QUERIES} queries per batch")
+    for query in request_body.queries:
+        check_sources(query)
+    queries = [query.model_dump() for query in request_body.queries]
+
+    async def results():
+        errors = 0
+        async for frame in app.state.scraper.scrape_batch(queries):
+            if 'error' in frame:
+                errors += 1
+            else:
+                await asyncio.to_thread(
+                    app.state.product_store.add_products, frame['products'], 'all', queries[frame['index']]
+                )
+            yield frame
+        yield {'type': 'done', 'count': len(queries), 'errors': errors}
+
+    if request_body.stream:
+        async def frames():
+            async for frame in results():
+                yield json.dumps(frame, default=serialize_product) + "\n"
+
+        return StreamingResponse(frames(), media_type="application/x-ndjson")
+
+    ordered = [None] * len(queries)
+    summary = {}
+    async for frame in results():
+        if frame['type'] == 'result':
+            if 'products' in frame:
+                frame['products'] = products_to_dicts(frame['products'])
+            ordered[frame.pop('index')] = frame
+        else:
+            summary = frame
+    return {'results': ordered, 'count': summary['count'], 'errors': summary['errors']}
+
+# queue a search in the background and poll (or long-poll with ?wait=) for it
+@app.post("/api/jobs", status_code=202)
+async def submit_job(request_body: JobParams):
+    check_sources(request_body)
+    job = app.state.job_queue.submit(request_body.model_dump(exclude={'priority'}), priority=request_body.priority)
+    return job.to_dict(include_result=False)
+
+@app.get("/api/jobs")
+async def job_stats():
+    return app.state.job_queue.stats()
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, response: Response, wait: float = 0, changes_only: bool = False):
+    job = app.state.job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    if wait > 0:
+        await app.state.job_queue.wait(job, timeout=min(wait, 60))
+    if not job.finished.is_set():
+        response.status_code = 202
+    data = job.to_dict()
+    if changes_only and 'result' in data:
+        # Only the delta against the previous scrape of the same query
+        data['result'] = {key: value for key, value in data['result'].items() if key != 'products'}
+    return data
+
+# page through previously scraped products without touching the retailers
+@app.get("/api/products")
+async def list_products(
+    q: Optional[str] = None,
+    source: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_rating: Optional[float] = None,
+    sort_by: str = "relevant",
+    page: int = 1,
+    page_size: int = 20,
+):
+    return await asyncio.to_thread(
+        app.state.product_store.query,
+        query=q, source=source, min_price=min_price, max_price=max_price,
+        min_rating=min_rating, sort_by=sort_by, page=page, page_size=page_size,
+    )
+
+# resized product images from the local cache (downloaded on first request)
+@app.get("/api/images")
+async def product_image(url: str, request: Request, w: int = 256):
+    image_cache = app.state.image_cache
+    try:
+        path, media_type, digest = await image_cache.thumbnail(url, w)
+    except ImageUnavailable as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    # One ETag per rendered file: widths snapping to the same thumbnail share it
+    etag = f'"{digest}-{image_cache.snap_width(w) if image_cache.resizing else 0}"'
+    headers = {"Cache-Control": IMAGE_CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+@app.get("/api/selectors/stats")
+async def selector_stats():
+    """Per-site selector hit rates learned while parsing"""
+    return app.state.selector_stats.snapshot()
+
+@app.get("/api/sources")
+async def source_status():
+    """Enabled retailers and their circuit breaker state"""
+    scraper = app.state.scraper
+    status = {
+        'sources': {source: scraper.get_breaker(source).to_dict() for source in scraper.sources},
+    }
+    if app.state.hedger is not None:
+        status['hedging'] = app.state.hedger.stats()
+    return status
 
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "message": "Scraper API is running"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Fetch, parse and post-processing metrics in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,269 @@
+"""Offline benchmarks for the scrape pipeline.
+
+Runs against the saved result pages the parser tests use (``tests/fixtures``)
+and a local stand-in HTTP server, so no network access is needed. Point
+``--fixtures`` at a directory of other saved pages to benchmark those instead.
+Results are written as JSON so runs from different commits can be compared:
+
+    python benchmarks/bench.py --output bench.json
+    python benchmarks/bench.py --compare bench.json
+    python benchmarks/bench.py --fixtures ~/saved-pages/amazon
+"""
+
+import argparse
+import asyncio
+import contextlib
+import glob
+import http.server
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import zlib
+
+SCRAPER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(SCRAPER_DIR, 'tests', 'fixtures')
+sys.path.insert(0, SCRAPER_DIR)
+
+from data_processor import DataProcessor  # noqa: E402
+from scrapers.amazon_scraper import AmazonScraper  # noqa: E402
+from scrapers.creative_scraper import CreativeScraper  # noqa: E402
+from scrapers.http_client import ClientManager  # noqa: E402
+from scrapers.parsers import get_parser_backend  # noqa: E402
+
+PAGE_COUNTS = (1, 3, 10)
+PRODUCT_COUNTS = (100, 1000, 10000)
+SORT_ORDERS = ('relevant', 'price_low_to_high', 'highest_rating')
+FETCH_REQUESTS = 200
+FETCH_CONCURRENCY = 20
+
+
+def load_fixtures(directory=FIXTURES_DIR):
+    """(file names, page sources) of the ``*.html`` pages in ``directory``"""
+    paths = sorted(glob.glob(os.path.join(directory, '*.html')))
+    if not paths:
+        sys.exit(f"No fixtures found in {directory}")
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            pages.append(f.read())
+    return [os.path.basename(path) for path in paths], pages
+
+
+def time_call(fn, repeat):
+    """Run ``fn`` ``repeat`` times (after one warm-up) and return timings"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(name, params, timings, items=None):
+    result = {
+        'name': name,
+        'params': params,
+        'repeat': len(timings),
+        'min_s': min(timings),
+        'median_s': statistics.median(timings),
+        'mean_s': statistics.fmean(timings),
+    }
+    if items:
+        result['items'] = items
+        result['per_item_us'] = result['median_s'] / items * 1e6
+    return result
+
+
+def raw_products(pages, count):
+    scraper = AmazonScraper()
+    with contextlib.redirect_stdout(io.StringIO()):
+        base = [p for html in pages for p in scraper.creative_parse(html, scraper.get_selectors(), limit=None)]
+    return [dict(base[i % len(base)]) for i in range(count)]
+
+
+def bench_parse(pages, repeat):
+    results = []
+    for backend in ('lxml', 'soup'):
+        scraper = AmazonScraper(parser_backend=backend)
+        selectors = scraper.get_selectors()
+        for page_count in PAGE_COUNTS:
+            batch = [pages[i % len(pages)] for i in range(page_count)]
+            timings = time_call(lambda: [scraper.creative_parse(html, selectors, limit=None) for html in batch], repeat)
+            results.append(summarize('creative_parse', {'backend': backend, 'pages': page_count}, timings, page_count))
+    return results
+
+
+def bench_extract(pages, repeat):
+    results = []
+    for backend in ('lxml', 'soup'):
+        parser = get_parser_backend(backend)
+        scraper = AmazonScraper(parser_backend=backend)
+        selectors = scraper.get_selectors()
+        elements = []
+        for html in pages:
+            elements.extend(parser.select(parser.parse(html), selectors['product_selectors'][0]))
+        timings = time_call(lambda: [scraper._extract_product_data(e, selectors, parser) for e in elements], repeat)
+        results.append(summarize('_extract_product_data', {'backend': backend}, timings, len(elements)))
+    return results
+
+
+def bench_standardize(pages, repeat):
+    results = []
+    processor = DataProcessor()
+    for count in PRODUCT_COUNTS:
+        products = raw_products(pages, count)
+        timings = time_call(lambda: processor.standardize_data(products, 'amazon'), repeat)
+        results.append(summarize('standardize_data', {'products': count}, timings, count))
+    return results
+
+
+def bench_filter_sort(pages, repeat):
+    results = []
+    scraper = CreativeScraper()
+    for count in PRODUCT_COUNTS:
+        products = scraper.processor.standardize_data(raw_products(pages, count), 'amazon')
+        for sort_by in SORT_ORDERS:
+            params = {'max_price': 500.0, 'sort_by': sort_by}
+            timings = time_call(lambda: scraper._apply_filters_creatively(products, params), repeat)
+            results.append(summarize('filter_and_sort', {'products': count, 'sort_by': sort_by}, timings, count))
+    return results
+
+
+class FixtureHandler(http.server.BaseHTTPRequestHandler):
+    """Serves a fixture page per request path, like a retailer search page"""
+
+    pages = []
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = self.pages[zlib.crc32(self.path.encode()) % len(self.pages)].encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def fixture_server(pages):
+    FixtureHandler.pages = pages
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def bench_fetch(pages, repeat):
+    async def run(base_url):
+        async with ClientManager(default_limit=FETCH_CONCURRENCY) as manager:
+            scraper = AmazonScraper(client_manager=manager)
+            semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+            async def fetch(i):
+                async with semaphore:
+                    return await scraper.fetch_page(f"{base_url}/s?k=headphones&page={i}")
+
+            start = time.perf_counter()
+            bodies = await asyncio.gather(*(fetch(i) for i in range(FETCH_REQUESTS)))
+            return time.perf_counter() - start, sum(len(b or '') for b in bodies)
+
+    timings, total_bytes = [], 0
+    with fixture_server(pages) as base_url:
+        for _ in range(repeat):
+            elapsed, total_bytes = asyncio.run(run(base_url))
+            timings.append(elapsed)
+    result = summarize('fetch_page', {'requests': FETCH_REQUESTS, 'concurrency': FETCH_CONCURRENCY},
+                       timings, FETCH_REQUESTS)
+    result['requests_per_s'] = FETCH_REQUESTS / result['median_s']
+    result['mb_per_s'] = total_bytes / result['median_s'] / 1e6
+    return [result]
+
+
+BENCHMARKS = {
+    'parse': bench_parse,
+    'extract': bench_extract,
+    'standardize': bench_standardize,
+    'filter_sort': bench_filter_sort,
+    'fetch': bench_fetch,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRAPER_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def result_key(result):
+    return result['name'], json.dumps(result['params'], sort_keys=True)
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {result_key(r): r for r in json.load(f)['results']}
+    print(f"{'benchmark':<60} {'baseline':>10} {'current':>10} {'change':>8}")
+    for result in results:
+        before = baseline.get(result_key(result))
+        if before is None:
+            continue
+        label = f"{result['name']} {json.dumps(result['params'], sort_keys=True)}"
+        change = result['median_s'] / before['median_s'] - 1
+        print(f"{label:<60} {before['median_s'] * 1e3:>8.2f}ms {result['median_s'] * 1e3:>8.2f}ms {change:>+7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', choices=sorted(BENCHMARKS), action='append',
+                        help='run only the named benchmark (repeatable)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, metavar='DIR',
+                        help='directory of saved Amazon result pages (default: %(default)s)')
+    parser.add_argument('--output', help='write JSON results to this file (default: stdout)')
+    parser.add_argument('--compare', metavar='BASELINE', help='print the change against a previous JSON run')
+    args = parser.parse_args()
+
+    fixture_names, pages = load_fixtures(args.fixtures)
+    results = []
+    for name in args.only or BENCHMARKS:
+        print(f"⏱️ {name}...", file=sys.stderr)
+        results.extend(BENCHMARKS[name](pages, args.repeat))
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'fixtures': fixture_names,
+        },
+        'results': results,
+    }
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    elif not args.compare:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
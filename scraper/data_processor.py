@@ -1,5 +1,189 @@
 import re
+import sys
 import json
+import heapq
+from array import array
+from scrapers.normalize import format_price, parse_counts, parse_price, parse_prices, parse_rating, parse_ratings
+
+
+class Product:
+    """Compact standardized product record.
+
+    Uses ``__slots__`` instead of a per-product dict, and interns the
+    low-cardinality ``source``/``category`` strings so every record shares one
+    copy. ``to_dict`` produces the standardized JSON shape at serialization
+    boundaries; ``get``/``[]`` keep dict-style reads working.
+    """
+
+    __slots__ = ('title', 'price', 'rating', 'reviews', 'source', 'url', 'image', 'moq', 'category', 'in_stock', 'offers')
+
+    def __init__(self, title, price, rating='0', reviews='0', source='Unknown', url='#', image='#',
+                 moq=None, category=None, in_stock=None):
+        self.title = title
+        self.price = price
+        self.rating = rating
+        self.reviews = reviews
+        self.source = sys.intern(source)
+        self.url = url
+        self.image = image
+        self.moq = moq
+        self.category = sys.intern(category) if category else None
+        # None when the listing didn't say; tracked for stock-change deltas
+        self.in_stock = in_stock
+        # Same product from other listings, filled in by cross-source dedup
+        self.offers = None
+
+    def to_dict(self):
+        data = {
+            'title': self.title,
+            'price': self.price,
+            'rating': self.rating,
+            'reviews': self.reviews,
+            'source': self.source,
+            'url': self.url,
+            'image': self.image,
+        }
+        if self.moq is not None:
+            data['moq'] = self.moq
+        if self.category is not None:
+            data['category'] = self.category
+        if self.in_stock is not None:
+            data['in_stock'] = self.in_stock
+        if self.offers:
+            data['offers'] = self.offers
+        return data
+
+    def get(self, key, default=None):
+        if key in self.__slots__:
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __eq__(self, other):
+        if isinstance(other, Product):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    # Mutable and equal to plain dicts, which are unhashable too; key sets of
+    # products by ``url`` (see fingerprint.product_key) instead
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Product({self.to_dict()!r})"
+
+
+def serialize_product(obj):
+    """``json.dumps(default=...)`` hook turning records back into dicts"""
+    if isinstance(obj, Product):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def products_to_dicts(products):
+    return [p.to_dict() if isinstance(p, Product) else p for p in products]
+
+
+class ProductTable:
+    """Standardized products with numeric columns parsed exactly once.
+
+    ``rows`` keeps the dicts that get serialized; ``price``, ``rating`` and
+    ``reviews`` are parallel ``array('d')`` columns (NaN when a value could
+    not be parsed) that filtering and sorting work on in bulk.
+    """
+
+    def __init__(self, rows=None):
+        self.rows = []
+        self.price = array('d')
+        self.rating = array('d')
+        self.reviews = array('d')
+        if rows:
+            self.append_rows(rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def append_rows(self, rows):
+        self.rows.extend(rows)
+        self.price.extend(parse_prices([row.get('price') for row in rows]))
+        self.rating.extend(parse_ratings([row.get('rating') for row in rows]))
+        self.reviews.extend(parse_counts([row.get('reviews') for row in rows]))
+
+    def extend(self, other):
+        self.rows.extend(other.rows)
+        self.price.extend(other.price)
+        self.rating.extend(other.rating)
+        self.reviews.extend(other.reviews)
+
+    def take(self, indices):
+        table = ProductTable()
+        table.rows = [self.rows[i] for i in indices]
+        table.price = array('d', (self.price[i] for i in indices))
+        table.rating = array('d', (self.rating[i] for i in indices))
+        table.reviews = array('d', (self.reviews[i] for i in indices))
+        return table
+
+    def filter_max_price(self, max_price, tolerance=1.1):
+        """Indices of products under ``max_price`` (unparseable prices pass)"""
+        limit = max_price * tolerance
+        # NaN compares False both ways, so "not p > limit" keeps unknown prices
+        return [i for i, p in enumerate(self.price) if not p > limit]
+
+    @staticmethod
+    def _known(column):
+        # Missing values sort as 0, like the old ``x.get(..., 0)`` sort keys
+        return array('d', (0.0 if v != v else v for v in column))
+
+    def sort_indices(self, sort_by):
+        indices = list(range(len(self.rows)))
+        if sort_by in ('price_low_to_high', 'price_high_to_low'):
+            key = self._known(self.price)
+            indices.sort(key=key.__getitem__, reverse=sort_by == 'price_high_to_low')
+        elif sort_by == 'highest_rating':
+            indices.sort(key=self._known(self.rating).__getitem__, reverse=True)
+        elif sort_by == 'most_popular':
+            indices.sort(key=self._known(self.reviews).__getitem__, reverse=True)
+        else:
+            # relevant: rating desc, then reviews desc (two stable passes)
+            indices.sort(key=self._known(self.reviews).__getitem__, reverse=True)
+            indices.sort(key=self._known(self.rating).__getitem__, reverse=True)
+        return indices
+
+    def sorted_rows(self, sort_by):
+        return [self.rows[i] for i in self.sort_indices(sort_by)]
+
+    def top_k(self, k, sort_by):
+        """First ``k`` rows of ``sorted_rows`` without a full sort"""
+        if k >= len(self.rows):
+            return self.sorted_rows(sort_by)
+        n = range(len(self.rows))
+        if sort_by == 'price_low_to_high':
+            price = self._known(self.price)
+            indices = heapq.nsmallest(k, n, key=price.__getitem__)
+        elif sort_by == 'price_high_to_low':
+            price = self._known(self.price)
+            indices = heapq.nsmallest(k, n, key=lambda i: -price[i])
+        elif sort_by == 'highest_rating':
+            rating = self._known(self.rating)
+            indices = heapq.nsmallest(k, n, key=lambda i: -rating[i])
+        elif sort_by == 'most_popular':
+            reviews = self._known(self.reviews)
+            indices = heapq.nsmallest(k, n, key=lambda i: -reviews[i])
+        else:
+            rating, reviews = self._known(self.rating), self._known(self.reviews)
+            indices = heapq.nsmallest(k, n, key=lambda i: (-rating[i], -reviews[i]))
+        return [self.rows[i] for i in indices]
+
 
 class DataProcessor:
     def __init__(self):
@@ -11,50 +195,67 @@ class DataProcessor:
         }
     
     def standardize_data(self, products, source):
-        """Convert all products to standardized format"""
-        processor = self.source_processors.get(source, self._process_generic)
+        """Convert all products to standardized ``Product`` records"""
+        processor = self.source_processors.get(source)
+        if processor is None:
+            return [self._process_generic(product, source or 'Unknown') for product in products if product]
         return [processor(product) for product in products if product]
+
+    def standardize_table(self, products, source):
+        """Standardize products and parse their numeric fields once"""
+        return ProductTable(self.standardize_data(products, source))
     
     def _process_amazon(self, product):
-        return {
-            'title': product.get('title', 'Unknown Product'),
-            'price': f"${product.get('price', '0')}",
-            'rating': product.get('rating', '0').split()[0] if 'rating' in product else '0',
-            'reviews': '0',
-            'source': 'Amazon',
-            'url': '#',
-            'image': '#'
-        }
+        return Product(
+            title=product.get('title', 'Unknown Product'),
+            price=self._display_price(product),
+            rating=self._display_number(parse_rating(product.get('rating'))),
+            reviews=str(product.get('review_count', '0')),
+            source='Amazon',
+            url=product.get('link', '#'),
+            image=product.get('image', '#'),
+            category=product.get('category'),
+            in_stock=product.get('in_stock'),
+        )
     
     def _process_alibaba(self, product):
-        price = product.get('price', '0')
-        if '-' in str(price):
-            price = str(price).split('-')[0]
-        
-        return {
-            'title': product.get('title', 'Unknown Product'),
-            'price': f"${price}",
-            'rating': product.get('rating', '0'),
-            'reviews': '0',
-            'source': 'Alibaba',
-            'url': '#',
-            'image': '#',
-            'moq': '1'
-        }
+        # Ranges ("US $1.50 - 3.20") are listed at their low end
+        price = parse_price(product.get('price'))
+        return Product(
+            title=product.get('title', 'Unknown Product'),
+            price=format_price(price.amount, price.currency) if price else format_price(0),
+            rating=self._display_number(parse_rating(product.get('rating'))),
+            source='Alibaba',
+            moq='1',
+            category=product.get('category'),
+            in_stock=product.get('in_stock'),
+        )
     
-    def _process_generic(self, product):
-        return {
-            'title': product.get('title', 'Unknown Product'),
-            'price': str(product.get('price', '0')),
-            'rating': str(product.get('rating', '0')),
-            'reviews': '0',
-            'source': 'Unknown',
-            'url': '#',
-            'image': '#'
-        }
+    @staticmethod
+    def _display_price(product):
+        price = parse_price(product.get('price'))
+        if price is None:
+            return format_price(0)
+        high = product.get('price_max', price.high)
+        return format_price(price.amount, product.get('currency') or price.currency, high)
+
+    @staticmethod
+    def _display_number(value):
+        return '0' if value is None else f"{value:g}"
+
+    def _process_generic(self, product, source='Unknown'):
+        # ``source`` is also what cross-source dedup tells retailers apart by
+        return Product(
+            title=product.get('title', 'Unknown Product'),
+            price=str(product.get('price', '0')),
+            rating=str(product.get('rating', '0')),
+            source=source,
+            category=product.get('category'),
+            in_stock=product.get('in_stock'),
+        )
     
     def _process_aliexpress(self, product):
-        return self._process_generic(product)
+        return self._process_generic(product, 'AliExpress')
     
     def _process_walmart(self, product):
-        return self._process_generic(product)
\ No newline at end of file
+        return self._process_generic(product, 'Walmart')
\ No newline at end of file
@@ -0,0 +1,166 @@
+import random
+import re
+import zlib
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'the', 'for', 'with', 'of', 'in', 'on', 'to', 'by', 'or', 'new', 'pack',
+})
+# Mersenne prime modulus for the (a * h + b) mod p hash family; 31 bits keeps
+# the permuted hashes single-digit ints, which makes the min() passes cheap
+MERSENNE_PRIME = (1 << 31) - 1
+DEFAULT_NUM_PERM = 32
+DEFAULT_BANDS = 8
+DEFAULT_THRESHOLD = 0.6
+# Large buckets are only compared against their first few members, which
+# keeps the worst case linear when many titles share a band
+MAX_BUCKET_COMPARISONS = 8
+
+
+def title_tokens(title):
+    """Normalized token set of a product title"""
+    if not title or title == 'Unknown Product':
+        return frozenset()
+    return frozenset(t for t in TOKEN_PATTERN.findall(title.lower()) if t not in STOPWORDS)
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def _model_tokens(tokens):
+    return frozenset(t for t in tokens if not t.isalpha())
+
+
+def is_same_product(a, b, threshold=DEFAULT_THRESHOLD):
+    """Token Jaccard above ``threshold`` and no conflicting model numbers"""
+    if jaccard(a, b) < threshold:
+        return False
+    models_a, models_b = _model_tokens(a), _model_tokens(b)
+    # "XM4" vs "XM5": similar titles, different products. One side having an
+    # extra model-ish token (e.g. a year) is not a conflict on its own.
+    return not (models_a - models_b and models_b - models_a)
+
+
+class MinHashLSH:
+    """MinHash signatures banded into LSH buckets.
+
+    Per-token permuted hashes are memoized, so a title's signature is just an
+    element-wise ``min`` over its tokens' cached tuples.
+    """
+
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = random.Random(seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._perms = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(MERSENNE_PRIME)) for _ in range(num_perm)]
+        self._token_hashes = {}
+
+    def _token_hash(self, token):
+        hashes = self._token_hashes.get(token)
+        if hashes is None:
+            h = zlib.crc32(token.encode('utf-8'))
+            hashes = self._token_hashes[token] = tuple((a * h + b) % MERSENNE_PRIME for a, b in self._perms)
+        return hashes
+
+    def signature(self, tokens):
+        cache = self._token_hashes
+        return tuple(map(min, zip(*[cache.get(t) or self._token_hash(t) for t in tokens])))
+
+    def band_keys(self, signature):
+        r = self.rows
+        return [(band, signature[band * r:(band + 1) * r]) for band in range(self.bands)]
+
+
+def group_products(titles, threshold=DEFAULT_THRESHOLD, lsh=None, sources=None):
+    """Group indices of near-duplicate titles; returns a list of index lists.
+
+    Candidate pairs come from LSH buckets and are confirmed with the exact
+    token Jaccard similarity, so the cost grows roughly linearly with the
+    number of products rather than with the number of pairs.
+
+    With ``sources`` (one per title) a group never holds two listings of the
+    same source: near-identical titles from one retailer are variants (colour,
+    size), not the same offer.
+    """
+    lsh = lsh or MinHashLSH()
+    parent = list(range(len(titles)))
+    # root -> sources of its group
+    group_sources = {i: {source} for i, source in enumerate(sources)} if sources is not None else None
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    tokens = [title_tokens(t) for t in titles]
+    buckets = {}
+    for i, toks in enumerate(tokens):
+        if len(toks) < 2:
+            continue
+        for key in lsh.band_keys(lsh.signature(toks)):
+            buckets.setdefault(key, []).append(i)
+
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        anchors = members[:MAX_BUCKET_COMPARISONS]
+        for i in members[1:]:
+            root = find(i)
+            for j in anchors:
+                if j == i:
+                    break
+                anchor_root = find(j)
+                if anchor_root == root:
+                    break
+                if group_sources is not None and not group_sources[root].isdisjoint(group_sources[anchor_root]):
+                    continue
+                if is_same_product(tokens[i], tokens[j], threshold):
+                    parent[root] = anchor_root
+                    if group_sources is not None:
+                        group_sources[anchor_root] |= group_sources.pop(root)
+                    break
+
+    groups = {}
+    for i in range(len(titles)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+def dedupe_offers(table, threshold=DEFAULT_THRESHOLD):
+    """Collapse near-duplicate products from different sources to the
+    cheapest offer of each group.
+
+    ``table`` is a ``ProductTable``; the result keeps first-seen group order
+    and records every grouped offer on the kept product's ``offers``.
+    """
+    if len(table) < 2:
+        return table
+    groups = group_products([row.get('title') for row in table.rows], threshold,
+                            sources=[row.get('source') for row in table.rows])
+    if len(groups) == len(table):
+        return table
+
+    price = table.price
+    keep = []
+    for members in sorted(groups, key=lambda g: g[0]):
+        # NaN prices never win the "cheapest" comparison
+        cheapest = min(members, key=lambda i: (price[i] != price[i], price[i] if price[i] == price[i] else 0.0, i))
+        keep.append(cheapest)
+        if len(members) > 1:
+            offers = [
+                {'source': table.rows[i].get('source'), 'price': table.rows[i].get('price'), 'url': table.rows[i].get('url')}
+                for i in members
+            ]
+            row = table.rows[cheapest]
+            if isinstance(row, dict):
+                row['offers'] = offers
+            else:
+                row.offers = offers
+    return table.take(keep)
@@ -0,0 +1,156 @@
+"""Sharded JSON export of search results for the static UI.
+
+Instead of one ``products.json`` the UI imports whole, a search is written
+as a small manifest plus files it fetches on demand::
+
+    <shard_dir>/<build>/pages/1.json        products, PAGE_SIZE per shard
+    <shard_dir>/<build>/index/price.json    {"ids": [...], "values": [...]}
+    <shard_dir>/<build>/index/rating.json
+    <shard_dir>/<build>/index/reviews.json
+    <shard_dir>/<build>/index/source.json   {"Amazon": [ids], ...}
+
+Product ids are positions in the order the search answered with, so
+shard N holds ids ``(N-1)*page_size`` onwards. The index files keep ids
+in price ascending and rating and review count descending order, with
+their values next to them. A price filter is a prefix of the price index
+and a rating filter a prefix of the rating index, so the UI sorts and
+filters from the indexes and only fetches the shards it shows. The
+manifest embeds the first page, so the initial render needs one small
+import.
+
+Each export goes to a new build directory and the manifest is replaced
+last. Clients still paging through the previous build keep working until
+it ages out (``KEEP_BUILDS``). Exports in one process run one at a time,
+and pruning only ever removes builds older than the one just written.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+
+from data_processor import products_to_dicts
+from product_store import export_json
+from scrapers.normalize import parse_count, parse_number, parse_price, parse_rating
+
+DEFAULT_PAGE_SIZE = 24
+KEEP_BUILDS = 2
+# Index name -> (UI record field, descending)
+SORT_INDEXES = {
+    'price': ('price', False),
+    'rating': ('rating', True),
+    'reviews': ('reviewCount', True),
+}
+_export_lock = threading.Lock()
+
+
+def _first(product, *keys):
+    return next((product[key] for key in keys if product.get(key) is not None), None)
+
+
+def ui_record(product):
+    """The ProductCard shape: numeric price/rating/reviewCount, camelCase
+    keys (scraped, standardized and already-exported records all map)"""
+    price = parse_price(product.get('price'))
+    record = {
+        'title': product.get('title', 'Unknown Product'),
+        'price': price.amount if price else None,
+        'rating': parse_rating(product.get('rating')) or 0.0,
+        'reviewCount': parse_count(_first(product, 'reviewCount', 'review_count', 'reviews')) or 0,
+        'source': product.get('source', 'Unknown'),
+        'link': product.get('link') or product.get('url', '#'),
+        'image': product.get('image', ''),
+    }
+    if price and price.currency:
+        record['currency'] = price.currency
+    original_price = parse_number(_first(product, 'originalPrice', 'original_price'))
+    if original_price:
+        record['originalPrice'] = original_price
+    for ui_key, keys in (('category', ('category',)), ('description', ('description',)),
+                         ('vendor', ('vendor',)), ('shipping', ('shipping',)), ('inStock', ('inStock', 'in_stock')),
+                         ('thumbnails', ('thumbnails',)), ('offers', ('offers',))):
+        value = _first(product, *keys)
+        if value is not None:
+            record[ui_key] = value
+    if record['image'] == '#':
+        record['image'] = ''
+    return record
+
+
+def _sort_index(records, field, descending):
+    """Ids ordered by ``field``, unknown values last, with the values alongside"""
+    known = [i for i, record in enumerate(records) if record.get(field) is not None]
+    known.sort(key=lambda i: records[i][field], reverse=descending)
+    unknown = [i for i, record in enumerate(records) if record.get(field) is None]
+    return {'ids': known + unknown, 'values': [records[i][field] for i in known] + [None] * len(unknown)}
+
+
+def _source_index(records):
+    index = {}
+    for i, record in enumerate(records):
+        index.setdefault(record['source'], []).append(i)
+    return index
+
+
+def _write(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(payload, f, separators=(',', ':'))
+
+
+def _prune_builds(shard_dir, build, keep):
+    """Remove builds older than ``build`` beyond the newest ``keep`` (``build``
+    included); newer builds belong to another export and are left alone"""
+    older = sorted(
+        (entry for entry in os.scandir(shard_dir)
+         if entry.is_dir() and entry.name.isdigit() and int(entry.name) < int(build)),
+        key=lambda entry: int(entry.name),
+    )
+    for entry in older[:max(0, len(older) - max(keep - 1, 0))]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def export_catalog(products, shard_dir, manifest_path, search_params=None, url_prefix='/products',
+                   page_size=DEFAULT_PAGE_SIZE, keep_builds=KEEP_BUILDS):
+    """Write ``products`` (in display order) as shards + indexes under a new
+    build in ``shard_dir``, then the manifest; returns the manifest.
+
+    ``url_prefix`` is where the UI serves ``shard_dir`` from.
+    """
+    records = [ui_record(product) for product in products_to_dicts(products)]
+    with _export_lock:
+        return _export_build(records, shard_dir, manifest_path, search_params, url_prefix, page_size, keep_builds)
+
+
+def _export_build(records, shard_dir, manifest_path, search_params, url_prefix, page_size, keep_builds):
+    build = str(time.time_ns())
+    build_dir = os.path.join(shard_dir, build)
+    pages = max(1, -(-len(records) // page_size))
+    for page in range(pages):
+        _write(os.path.join(build_dir, 'pages', f'{page + 1}.json'),
+               records[page * page_size:(page + 1) * page_size])
+    for name, (field, descending) in SORT_INDEXES.items():
+        _write(os.path.join(build_dir, 'index', f'{name}.json'), _sort_index(records, field, descending))
+    _write(os.path.join(build_dir, 'index', 'source.json'), _source_index(records))
+
+    prices = [record['price'] for record in records if record['price'] is not None]
+    base_url = f"{url_prefix.rstrip('/')}/{build}"
+    manifest = {
+        'build': build,
+        'generated_at': time.time(),
+        'search_params': search_params or {},
+        'count': len(records),
+        'page_size': page_size,
+        'pages': pages,
+        'page_url': base_url + '/pages/{page}.json',
+        'indexes': {name: f"{base_url}/index/{name}.json" for name in (*SORT_INDEXES, 'source')},
+        'sources': {source: len(ids) for source, ids in _source_index(records).items()},
+        'price_range': {'min': min(prices), 'max': max(prices)} if prices else None,
+        'products': records[:page_size],
+    }
+    # Readers see either the previous manifest or this one, never a partial file
+    os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+    export_json(manifest_path, manifest)
+    _prune_builds(shard_dir, build, keep_builds)
+    return manifest
@@ -0,0 +1,245 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+
+from query_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first: a user waiting on a job beats the watchlist refresh
+PRIORITY_USER = 0
+PRIORITY_SCHEDULED = 10
+DEFAULT_WORKERS = 4
+# Finished jobs kept around for polling before the oldest are dropped
+DEFAULT_MAX_FINISHED = 1000
+DEFAULT_WATCH_INTERVAL = 60 * 60
+SCHEDULER_TICK = 30
+# First runs after start-up are spread this many seconds apart
+STARTUP_STAGGER = 15
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+class Job:
+    def __init__(self, params, key, priority, origin):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.key = key
+        self.priority = priority
+        self.origin = origin
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.finished = asyncio.Event()
+
+    def to_dict(self, include_result=True):
+        data = {
+            'id': self.id,
+            'status': self.status,
+            'priority': self.priority,
+            'origin': self.origin,
+            'params': self.params,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+        if self.error is not None:
+            data['error'] = self.error
+        if include_result and self.status == DONE:
+            data['result'] = self.result
+        return data
+
+
+class JobQueue:
+    """Priority queue of search jobs drained by a pool of async workers.
+
+    ``runner`` is an async callable taking the search params and returning a
+    JSON-serializable result. Submitting a search that is already queued or
+    running returns the existing job instead of scraping it twice.
+    """
+
+    def __init__(self, runner, workers=DEFAULT_WORKERS, max_finished=DEFAULT_MAX_FINISHED):
+        self.runner = runner
+        self.workers = workers
+        self.max_finished = max_finished
+        self._queue = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._jobs = OrderedDict()
+        # normalized query -> queued or running job
+        self._active = {}
+        self._tasks = []
+        self.submitted = 0
+        self.deduplicated = 0
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, params, priority=PRIORITY_USER, origin='api'):
+        """Queue a search and return its ``Job`` (or the identical one already pending)"""
+        key = normalize_query(params)
+        job = self._active.get(key)
+        if job is not None:
+            self.deduplicated += 1
+            if job.status == QUEUED and priority < job.priority:
+                # Re-queue at the higher priority; the stale entry is skipped
+                job.priority = priority
+                self._queue.put_nowait((priority, next(self._seq), job))
+            return job
+
+        job = Job(params, key, priority, origin)
+        self._jobs[job.id] = job
+        self._active[key] = job
+        self.submitted += 1
+        self._queue.put_nowait((priority, next(self._seq), job))
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    async def wait(self, job, timeout=None):
+        """Wait until ``job`` finishes or ``timeout`` seconds pass"""
+        try:
+            await asyncio.wait_for(job.finished.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    async def _worker(self):
+        while True:
+            priority, _, job = await self._queue.get()
+            try:
+                if job.status != QUEUED or priority != job.priority:
+                    continue
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = await self.runner(job.params)
+            job.status = DONE
+        except asyncio.CancelledError:
+            job.status = FAILED
+            job.error = 'cancelled'
+            raise
+        except Exception as e:
+            logger.warning("⚠️ Job %s failed: %s", job.id, e)
+            job.status = FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            self._active.pop(job.key, None)
+            job.finished.set()
+            self._trim()
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished.is_set()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return {
+            **counts,
+            'workers': len(self._tasks),
+            'submitted': self.submitted,
+            'deduplicated': self.deduplicated,
+        }
+
+
+def load_watchlist(path):
+    """Read ``{"interval_seconds": N, "queries": [search params, ...]}``;
+    a query may carry its own ``interval_seconds``"""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        config = json.load(f)
+    default_interval = config.get('interval_seconds', DEFAULT_WATCH_INTERVAL)
+    entries = []
+    for query in config.get('queries', []):
+        query = dict(query)
+        interval = query.pop('interval_seconds', default_interval)
+        entries.append((query, interval))
+    return entries
+
+
+class Scheduler:
+    """Periodically re-submits the watchlist queries at scheduled priority.
+
+    ``last_scraped(params)`` (epoch seconds or None) lets a restart pick up
+    the schedule where it was: queries scraped within their interval wait
+    for the rest of it. Queries that are due are spread ``stagger`` seconds
+    apart, so a restart (e.g. ``uvicorn --reload``) doesn't scrape the whole
+    watchlist at once.
+    """
+
+    def __init__(self, queue, watchlist, tick=SCHEDULER_TICK, last_scraped=None, stagger=STARTUP_STAGGER):
+        self.queue = queue
+        self.watchlist = watchlist
+        self.tick = tick
+        self.last_scraped = last_scraped
+        self.stagger = stagger
+        self._next_run = None
+        self._task = None
+
+    def _first_runs(self, now):
+        wall = time.time()
+        runs = []
+        due = 0
+        for params, interval in self.watchlist:
+            last = self.last_scraped(params) if self.last_scraped else None
+            if last is not None and wall - last < interval:
+                runs.append(now + interval - (wall - last))
+            else:
+                runs.append(now + due * self.stagger)
+                due += 1
+        return runs
+
+    def start(self):
+        if self.watchlist and self._task is None:
+            self._task = asyncio.ensure_future(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def run_due(self, now=None):
+        """Submit every watchlist query whose interval has elapsed"""
+        now = time.monotonic() if now is None else now
+        if self._next_run is None:
+            self._next_run = self._first_runs(now)
+        submitted = 0
+        for i, (params, interval) in enumerate(self.watchlist):
+            if now >= self._next_run[i]:
+                self.queue.submit(params, priority=PRIORITY_SCHEDULED, origin='watchlist')
+                self._next_run[i] = now + interval
+                submitted += 1
+        return submitted
+
+    async def _loop(self):
+        while True:
+            submitted = self.run_due()
+            if submitted:
+                logger.info("⏰ Queued %d watchlist re-scrapes", submitted)
+            await asyncio.sleep(self.tick)
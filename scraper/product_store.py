@@ -0,0 +1,173 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from scrapers.normalize import parse_number
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    query TEXT NOT NULL,
+    category TEXT,
+    title TEXT,
+    price REAL,
+    rating REAL,
+    reviews INTEGER,
+    link TEXT,
+    data TEXT NOT NULL,
+    scraped_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_price ON products (price);
+CREATE INDEX IF NOT EXISTS idx_products_rating ON products (rating);
+CREATE INDEX IF NOT EXISTS idx_products_source ON products (source);
+CREATE INDEX IF NOT EXISTS idx_products_query ON products (query, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_products_listing ON products (source, link, scraped_at);
+"""
+
+# Whitelisted ORDER BY clauses, keyed like SearchParams.sort_by
+SORT_CLAUSES = {
+    'price_low_to_high': 'price IS NULL, price ASC',
+    'price_high_to_low': 'price IS NULL, price DESC',
+    'highest_rating': 'rating IS NULL, rating DESC',
+    'most_popular': 'reviews IS NULL, reviews DESC',
+    'relevant': 'rating IS NULL, rating DESC, reviews DESC',
+    'newest': 'scraped_at DESC',
+}
+
+
+def _number(value, cast=float):
+    number = parse_number(value)
+    return None if number is None else cast(number)
+
+
+def normalize_query_text(text):
+    return ' '.join(str(text or '').lower().split())
+
+
+def export_json(path, payload):
+    """Atomically write ``payload`` as JSON (readers never see a partial file)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(payload, f, indent=4)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class ProductStore:
+    """SQLite-backed history of scraped products.
+
+    Every search appends its products (with source, query and timestamp)
+    instead of overwriting the previous one; ``query`` reads the latest
+    sighting of each listing (source + link, else title). Methods are
+    blocking; call them through ``asyncio.to_thread`` from async code.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+
+    def add_products(self, products, source, search_params=None, scraped_at=None):
+        """Bulk-insert one search's products; returns the number stored"""
+        search_params = search_params or {}
+        query = normalize_query_text(search_params.get('search_input'))
+        category = search_params.get('category')
+        scraped_at = scraped_at or time.time()
+        # Accept compact Product records as well as plain dicts
+        products = [p.to_dict() if hasattr(p, 'to_dict') else p for p in products if p]
+        rows = [
+            (
+                str(product.get('source') or source).lower(),
+                query,
+                category,
+                product.get('title'),
+                _number(product.get('price')),
+                _number(product.get('rating')),
+                _number(product.get('reviews', product.get('review_count')), int),
+                product.get('link') or product.get('url'),
+                json.dumps(product),
+                scraped_at,
+            )
+            for product in products if product
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT INTO products (source, query, category, title, price, rating, reviews, link, data, scraped_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows,
+            )
+        return len(rows)
+
+    def last_scraped(self, search_params):
+        """When the search's query was last stored (epoch seconds), or None"""
+        query = normalize_query_text((search_params or {}).get('search_input'))
+        with self._lock:
+            row = self._conn.execute('SELECT MAX(scraped_at) FROM products WHERE query = ?', (query,)).fetchone()
+        return row[0]
+
+    def query(self, query=None, source=None, min_price=None, max_price=None, min_rating=None,
+              sort_by='relevant', page=1, page_size=DEFAULT_PAGE_SIZE):
+        """Filtered, sorted page of stored products plus the total match count"""
+        # Which rows count as sightings, and then which latest sightings match
+        scope, scope_args = [], []
+        if query:
+            scope.append('query = ?')
+            scope_args.append(normalize_query_text(query))
+        if source:
+            scope.append('source = ?')
+            scope_args.append(source.lower())
+        clauses, args = ['sighting = 1'], []
+        if min_price is not None:
+            clauses.append('price >= ?')
+            args.append(min_price)
+        if max_price is not None:
+            clauses.append('price <= ?')
+            args.append(max_price)
+        if min_rating is not None:
+            clauses.append('rating >= ?')
+            args.append(min_rating)
+        latest = (
+            'WITH latest AS (SELECT *, ROW_NUMBER() OVER ('
+            'PARTITION BY source, COALESCE(link, title, id) ORDER BY scraped_at DESC, id DESC) AS sighting '
+            f"FROM products {'WHERE ' + ' AND '.join(scope) if scope else ''}) "
+        )
+        where = f"WHERE {' AND '.join(clauses)}"
+        args = scope_args + args
+        order = SORT_CLAUSES.get(sort_by, SORT_CLAUSES['relevant'])
+        page = max(1, page)
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+        with self._lock:
+            total = self._conn.execute(f'{latest}SELECT COUNT(*) FROM latest {where}', args).fetchone()[0]
+            rows = self._conn.execute(
+                f'{latest}SELECT data, source, scraped_at FROM latest {where} ORDER BY {order} LIMIT ? OFFSET ?',
+                args + [page_size, (page - 1) * page_size],
+            ).fetchall()
+
+        items = []
+        for row in rows:
+            item = json.loads(row['data'])
+            item.setdefault('source', row['source'])
+            item['scraped_at'] = row['scraped_at']
+            items.append(item)
+        return {'items': items, 'total': total, 'page': page, 'page_size': page_size}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
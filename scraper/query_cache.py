@@ -0,0 +1,109 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL = 5 * 60
+
+
+def normalize_query(params):
+    """Build a hashable cache key from search params.
+
+    Case and whitespace in the free-text fields do not change the results, so
+    "Wireless  Headphones" and "wireless headphones" share an entry.
+    """
+    def text(value):
+        return ' '.join(str(value or '').lower().split())
+
+    max_price = params.get('max_price')
+    return (
+        text(params.get('search_input')),
+        text(params.get('category')) or 'all',
+        round(float(max_price), 2) if max_price is not None else None,
+        text(params.get('sort_by')) or 'relevant',
+        params.get('target_results'),
+        params.get('max_pages'),
+        params.get('limit'),
+        tuple(sorted(s.lower() for s in params['sources'])) if params.get('sources') else None,
+        # A shorter deadline can leave sources out of the answer
+        params.get('deadline'),
+    )
+
+
+class QueryCache:
+    """In-memory LRU of search results with TTL and single-flight coalescing.
+
+    Concurrent callers asking for the same key while a scrape is running all
+    await that one scrape instead of starting their own.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _cacheable(value):
+        # Empty result sets are usually a block or a transient failure, and
+        # partial ones are missing the sources that timed out, so they are
+        # shared with concurrent callers but not kept around.
+        if isinstance(value, dict):
+            return bool(value.get('products')) and not value.get('partial')
+        return bool(value)
+
+    async def get_or_compute(self, key, compute):
+        """Return ``(value, status)`` where status is hit, coalesced or miss"""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value, 'hit'
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), 'coalesced'
+
+        self.misses += 1
+
+        async def run():
+            try:
+                value = await compute()
+                if self._cacheable(value):
+                    self.set(key, value)
+                return value
+            finally:
+                self._inflight.pop(key, None)
+
+        task = self._inflight[key] = asyncio.ensure_future(run())
+        # Shielded so one cancelled caller does not abort the shared scrape
+        return await asyncio.shield(task), 'miss'
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'inflight': len(self._inflight),
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+        }
@@ -1,10 +1,58 @@
-import httpx
-from bs4 import BeautifulSoup
 import random
 import asyncio
+import contextlib
+import logging
+import time
+import urllib.parse
+from .metrics import metrics
+from .normalize import parse_count, parse_number, parse_price, parse_rating
+from .parsers import ParserBackendError, get_parser_backend
+from .rate_limiter import RETRYABLE_STATUSES, THROTTLE_STATUSES, backoff_delay, parse_retry_after
+from .selector_registry import default_registry
+from .selector_stats import SelectorStats
+from .stream_parser import DEFAULT_MAX_PAGE_BYTES, IncrementalProductParser, supports_streaming
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+# Sentinel for "use the scraper's configured result_limit"
+DEFAULT_LIMIT = object()
+
+
+class StreamUnavailable(Exception):
+    """The page could not be streamed; the buffered path should be used"""
+
+class PageUnavailable(Exception):
+    """A results page could not be fetched (retries spent or a hard HTTP error)"""
 
 class BaseScraper:
-    def __init__(self):
+    site_name = 'generic'
+    # Products extracted per results page unless a caller asks otherwise
+    result_limit = 10
+    # Number format of the site's prices/ratings (see normalize.LOCALE_DECIMAL_MARKS)
+    locale = 'en'
+
+    def __init__(self, client_manager=None, parser_backend='lxml', selector_stats=None,
+                 response_cache=None, rate_limiter=None, parse_executor=None, parse_memo=None,
+                 stream_parse=False, max_page_bytes=DEFAULT_MAX_PAGE_BYTES, selector_registry=None,
+                 hedger=None):
+        self.client_manager = client_manager
+        self.parse_executor = parse_executor
+        # Unchanged pages (same fingerprint) reuse the previously parsed products
+        self.parse_memo = parse_memo
+        # Extract products while the page downloads (see stream_products)
+        self.stream_parse = stream_parse
+        self.max_page_bytes = max_page_bytes
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter
+        # Re-sends requests that outlive the site's p95 latency (see hedging.py)
+        self.hedger = hedger
+        self.parser = get_parser_backend(parser_backend)
+        # Shared across scrapers by CreativeScraper; learns which fallback
+        # selector wins per field so it can be tried first next time.
+        self.selector_stats = selector_stats if selector_stats is not None else SelectorStats()
+        # Resolved on first use so parse workers never read the config file
+        self._selector_registry = selector_registry
         self.headers_list = [
             {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -28,141 +76,362 @@ class BaseScraper:
     
     def get_headers(self):
         return random.choice(self.headers_list)
+
+    @property
+    def selector_registry(self):
+        if self._selector_registry is None:
+            self._selector_registry = default_registry()
+        return self._selector_registry
+
+    def get_selectors(self):
+        """This site's precompiled selectors from config/selector_config.json"""
+        return self.selector_registry.get(self.site_name)
     
     async def fetch_page(self, url, client=None):
-        """Creative fetching with retries using httpx"""
+        """Creative fetching with retries using httpx, served from the
+        response cache when a fresh copy is available"""
+        started = time.perf_counter()
+        cache = self.response_cache
+        cached = None
+        if cache is not None:
+            cached = await cache.get(url, self.headers_list[0])
+            if cached is not None and (cached.fresh or cache.offline):
+                return self._fetch_done(started, 'cache', cached.body)
+            if cache.offline:
+                return self._fetch_done(started, 'offline_miss', None)
+
         close_client = False
-        if client is None:
+        if client is None and self.client_manager is not None:
+            client = await self.client_manager.get_client(url)
+        elif client is None:
+            import httpx
+
             client = httpx.AsyncClient(timeout=30.0)
             close_client = True
         
-        for attempt in range(3):
-            try:
-                response = await client.get(url, headers=self.get_headers())
-                if response.status_code == 200:
-                    if close_client:
-                        await client.aclose()
-                    return response.text
-                elif response.status_code == 429:  # Too many requests
-                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
-            except Exception as e:
-                print(f"Attempt {attempt + 1} failed: {e}")
-                await asyncio.sleep(1)
-        
-        if close_client:
-            await client.aclose()
-        return None
+        limiter = self.rate_limiter
+        outcome = 'error'
+        try:
+            for attempt in range(MAX_ATTEMPTS):
+                if attempt:
+                    metrics.inc('scraper_fetch_retries_total', site=self.site_name)
+                try:
+                    headers = self.get_headers()
+                    if cached is not None:
+                        headers = {**headers, **cached.validators()}
+                    async with (limiter.slot(url) if limiter else contextlib.nullcontext()):
+                        if self.hedger is not None:
+                            # A duplicate past the site's p95 waits for a slot of its own
+                            response = await self.hedger.run(
+                                self.site_name, lambda: client.get(url, headers=headers),
+                                lambda: self._limited_get(client, url, headers),
+                            )
+                        else:
+                            response = await client.get(url, headers=headers)
+                except Exception as e:
+                    metrics.inc('scraper_fetch_requests_total', site=self.site_name, status='error')
+                    logger.warning("Attempt %d for %s failed: %s", attempt + 1, url, e)
+                    await asyncio.sleep(backoff_delay(attempt))
+                    continue
+
+                status = response.status_code
+                outcome = str(status)
+                metrics.inc('scraper_fetch_requests_total', site=self.site_name, status=outcome)
+                if status == 200:
+                    if limiter:
+                        limiter.on_success(url)
+                    if cache is not None:
+                        await cache.put(url, headers, self.site_name, response)
+                    return self._fetch_done(started, outcome, response.text)
+                elif status == 304 and cached is not None:
+                    if limiter:
+                        limiter.on_success(url)
+                    await cache.refresh(cached, response)
+                    return self._fetch_done(started, outcome, cached.body)
+                elif status in THROTTLE_STATUSES:  # Too many requests / unavailable
+                    retry_after = parse_retry_after(response.headers.get('retry-after'))
+                    if limiter:
+                        limiter.on_throttle(url, retry_after)
+                    await asyncio.sleep(backoff_delay(attempt, retry_after))
+                elif status in RETRYABLE_STATUSES:
+                    await asyncio.sleep(backoff_delay(attempt))
+                else:
+                    logger.warning("⚠️ Giving up on %s: HTTP %d", url, status)
+                    break
+        finally:
+            if close_client:
+                await client.aclose()
+        return self._fetch_done(started, outcome, None)
+
+    async def _limited_get(self, client, url, headers):
+        async with (self.rate_limiter.slot(url) if self.rate_limiter else contextlib.nullcontext()):
+            return await client.get(url, headers=headers)
+
+    def _fetch_done(self, started, outcome, body):
+        if metrics.enabled:
+            metrics.observe('scraper_fetch_seconds', time.perf_counter() - started,
+                            site=self.site_name, outcome=outcome)
+            if body is not None:
+                metrics.observe('scraper_fetch_bytes', len(body), site=self.site_name)
+        return body
     
-    def creative_parse(self, html, selectors):
-        """Creative parsing with BeautifulSoup"""
-        soup = BeautifulSoup(html, 'html.parser')
+    async def page_products(self, url, selectors, limit=DEFAULT_LIMIT):
+        """All products of one results page, streamed when ``stream_parse`` is on;
+        raises ``PageUnavailable`` when the page cannot be fetched"""
+        if not self.stream_parse:
+            html = await self.fetch_page(url)
+            if html is None:
+                raise PageUnavailable(f"Could not fetch {url}")
+            return await self.parse(html, selectors, limit) if html else []
+        return [product async for product in self.stream_products(url, selectors, limit)]
+
+    async def stream_products(self, url, selectors, limit=DEFAULT_LIMIT, max_bytes=None):
+        """Yield products as their containers arrive, reading at most
+        ``max_bytes`` of the page (``max_page_bytes`` by default).
+
+        Cached pages, non-lxml backends, product selectors with combinators
+        and failed or non-200 responses go through ``fetch_page`` and
+        ``parse`` instead, and a streamed page no product came out of is
+        parsed whole so the other product selectors are tried too. Streamed pages are not written to the response
+        cache, since they are usually not read to the end.
+        """
+        if limit is DEFAULT_LIMIT:
+            limit = self.result_limit
+        streamable = self.client_manager is not None and supports_streaming(self.parser, selectors)
+        cache = self.response_cache
+        if streamable and cache is not None:
+            cached = await cache.get(url, self.headers_list[0])
+            streamable = not cache.offline and (cached is None or not cached.fresh)
+
+        if streamable:
+            import httpx
+
+            yielded = False
+            try:
+                async for product in self._stream_page(url, selectors, limit, max_bytes or self.max_page_bytes):
+                    yielded = True
+                    yield product
+                return
+            except (httpx.HTTPError, StreamUnavailable) as e:
+                if yielded:
+                    logger.warning("⚠️ Stream of %s broke off: %s", url, e)
+                    return
+                logger.debug("Streaming %s failed (%s), fetching it whole", url, e)
+
+        html = await self.fetch_page(url)
+        if html is None:
+            raise PageUnavailable(f"Could not fetch {url}")
+        if html:
+            for product in await self.parse(html, selectors, limit):
+                yield product
+
+    async def _stream_page(self, url, selectors, limit, max_bytes):
+        client = await self.client_manager.get_client(url)
+        limiter = self.rate_limiter
+        started = time.perf_counter()
+        received = 0
+        found = 0
+        # Raw bytes kept until the first product streams out: if none does (the
+        # streamable selector doesn't match this layout), the page is parsed
+        # whole so creative_parse can try the remaining product selectors
+        unmatched = []
+        async with (limiter.slot(url) if limiter else contextlib.nullcontext()):
+            async with client.stream('GET', url, headers=self.get_headers()) as response:
+                status = response.status_code
+                metrics.inc('scraper_fetch_requests_total', site=self.site_name, status=str(status))
+                if status != 200:
+                    if limiter and status in THROTTLE_STATUSES:
+                        limiter.on_throttle(url, parse_retry_after(response.headers.get('retry-after')))
+                    raise StreamUnavailable(f"HTTP {status}")
+                if limiter:
+                    limiter.on_success(url)
+
+                encoding = response.charset_encoding or 'utf-8'
+                parser = IncrementalProductParser(
+                    selectors, lambda element, backend: self._extract_product_data(element, selectors, backend),
+                    limit=limit, encoding=encoding,
+                )
+                with metrics.timer('scraper_parse_seconds', site=self.site_name, backend='lxml-stream'):
+                    async for chunk in response.aiter_bytes():
+                        chunk = chunk[:max_bytes - received]
+                        received += len(chunk)
+                        if unmatched is not None:
+                            unmatched.append(chunk)
+                        for product in parser.feed(chunk):
+                            found += 1
+                            unmatched = None
+                            yield product
+                        if parser.done:
+                            break
+                        if received >= max_bytes:
+                            logger.warning("⚠️ %s exceeded the %d byte page budget; keeping %d products",
+                                           url, max_bytes, found)
+                            break
+                    else:
+                        # Whole page read: flush products closed by the end of the document
+                        for product in parser.close():
+                            found += 1
+                            yield product
+
+        if not found and unmatched:
+            logger.debug("No product streamed from %s; parsing it whole", url)
+            for product in await self.parse(b''.join(unmatched).decode(encoding, errors='replace'), selectors, limit):
+                yield product
+
+        if metrics.enabled:
+            metrics.observe('scraper_fetch_seconds', time.perf_counter() - started,
+                            site=self.site_name, outcome='stream')
+            metrics.observe('scraper_fetch_bytes', received, site=self.site_name)
+            metrics.observe('scraper_parse_products', found, site=self.site_name)
+
+    async def parse(self, html, selectors, limit=DEFAULT_LIMIT):
+        """Parse off the event loop when a parse executor is configured"""
+        if limit is DEFAULT_LIMIT:
+            limit = self.result_limit
+        memo = self.parse_memo
+        if memo is not None:
+            memo_key = memo.key(self.site_name, html, selectors, limit)
+            products = memo.get(memo_key)
+            metrics.inc('scraper_parse_memo_total', site=self.site_name,
+                        result='miss' if products is None else 'hit')
+            if products is not None:
+                return products
+        with metrics.timer('scraper_parse_seconds', site=self.site_name, backend=self.parser.name):
+            if self.parse_executor is None:
+                products = self.creative_parse(html, selectors, limit)
+            else:
+                products = await self.parse_executor.parse(self, html, selectors, limit)
+        metrics.observe('scraper_parse_products', len(products), site=self.site_name)
+        if memo is not None:
+            memo.put(memo_key, products)
+        return products
+
+    def creative_parse(self, html, selectors, limit=DEFAULT_LIMIT):
+        """Creative parsing with the configured parser backend.
+
+        At most ``limit`` product elements are extracted (``result_limit`` by
+        default); ``None`` extracts every product on the page.
+        """
+        if limit is DEFAULT_LIMIT:
+            limit = self.result_limit
+        try:
+            return self._parse_with(self.parser, html, selectors, limit)
+        except ParserBackendError as e:
+            if self.parser.name == 'soup':
+                raise
+            logger.warning("⚠️ %s parser failed (%s), retrying with BeautifulSoup", self.parser.name, e)
+            return self._parse_with(get_parser_backend('soup'), html, selectors, limit)
+
+    def _parse_with(self, parser, html, selectors, limit):
+        root = parser.parse(html)
         products = []
         
         # Try different selectors creatively
         for selector in selectors['product_selectors']:
-            product_elements = soup.select(selector)
+            product_elements = parser.select(root, selector)
             if product_elements:
-                print(f"🎉 Found {len(product_elements)} products with selector: {selector}")
-                for element in product_elements[:10]:  # Limit to first 10 for performance
-                    product_data = self._extract_product_data(element, selectors)
+                logger.debug("🎉 Found %d products with selector: %s", len(product_elements), selector)
+                for element in product_elements[:limit]:
+                    product_data = self._extract_product_data(element, selectors, parser)
                     if product_data:
                         products.append(product_data)
                 break
         
         return products
+
+    def _select_first(self, parser, element, selectors, field, required_attr=None):
+        """Return the first element matched by the field's fallback selectors,
+        trying the historically best selector first"""
+        candidates = selectors.get(field)
+        if not candidates:
+            return None
+        stats = self.selector_stats
+        record_metrics = metrics.enabled
+        for selector in stats.order(self.site_name, field, candidates):
+            found = parser.select_one(element, selector)
+            hit = found is not None and (required_attr is None or parser.attr(found, required_attr) is not None)
+            stats.record(self.site_name, field, selector, hit)
+            if record_metrics:
+                metrics.inc('scraper_selector_attempts_total', site=self.site_name, field=field,
+                            result='hit' if hit else 'miss')
+            if hit:
+                return found
+        return None
     
-    def _extract_product_data(self, element, selectors):
+    def _extract_product_data(self, element, selectors, parser=None):
         """Extract data creatively with multiple fallbacks"""
+        parser = parser or self.parser
         product = {}
         
         # Creative title extraction
-        for selector in selectors['title_selectors']:
-            title_elem = element.select_one(selector)
-            if title_elem:
-                product['title'] = title_elem.get_text().strip()
-                break
+        title_elem = self._select_first(parser, element, selectors, 'title_selectors')
+        if title_elem is not None:
+            product['title'] = parser.text(title_elem).strip()
         
         # Creative price extraction
-        for selector in selectors['price_selectors']:
-            price_elem = element.select_one(selector)
-            if price_elem:
-                product['price'] = self._clean_price(price_elem.get_text())
-                break
+        price_elem = self._select_first(parser, element, selectors, 'price_selectors')
+        if price_elem is not None:
+            price = parse_price(parser.text(price_elem), self.locale)
+            if price is not None:
+                product['price'] = price.amount
+                if price.high is not None:
+                    product['price_max'] = price.high
+                if price.currency:
+                    product['currency'] = price.currency
         
         # Creative rating extraction
-        for selector in selectors['rating_selectors']:
-            rating_elem = element.select_one(selector)
-            if rating_elem:
-                product['rating'] = self._clean_rating(rating_elem.get_text())
-                break
+        rating_elem = self._select_first(parser, element, selectors, 'rating_selectors')
+        if rating_elem is not None:
+            rating = parse_rating(parser.text(rating_elem), self.locale)
+            if rating is not None:
+                product['rating'] = rating
         
         # Creative link extraction
-        for selector in selectors.get('link_selectors', []):
-            link_elem = element.select_one(selector)
-            if link_elem and link_elem.has_attr('href'):
-                product['link'] = "https://www.amazon.com" + link_elem['href']
-                product['source'] = "Amazon"
-                break
+        link_elem = self._select_first(parser, element, selectors, 'link_selectors', 'href')
+        if link_elem is not None:
+            product['link'] = "https://www.amazon.com" + parser.attr(link_elem, 'href')
+            product['source'] = "Amazon"
 
-        for selector in selectors.get('description_selectors', []):
-            desc_elem = element.select_one(selector)
-            if desc_elem:
-                product['description'] = desc_elem.get_text().strip()
-                break
+        desc_elem = self._select_first(parser, element, selectors, 'description_selectors')
+        if desc_elem is not None:
+            product['description'] = parser.text(desc_elem).strip()
         
-        for selector in selectors.get('image_selectors', []):
-            img_elem = element.select_one(selector)
-            if img_elem and img_elem.has_attr('src'):
-                product['image'] = "https://www.amazon.com" + img_elem['src']
-                break
+        img_elem = self._select_first(parser, element, selectors, 'image_selectors', 'src')
+        if img_elem is not None:
+            # Result images are usually absolute (CDN) URLs, occasionally site-relative
+            product['image'] = urllib.parse.urljoin("https://www.amazon.com", parser.attr(img_elem, 'src'))
 
-        for selector in selectors.get('shipping_selectors', []):
-            ship_elem = element.select_one(selector)
-            if ship_elem:
-                product['shipping'] = ship_elem.get_text().strip()
-                break
+        ship_elem = self._select_first(parser, element, selectors, 'shipping_selectors')
+        if ship_elem is not None:
+            product['shipping'] = parser.text(ship_elem).strip()
         
-        for selector in selectors.get('in_stock_selectors', []):
-            stock_elem = element.select_one(selector)
-            if stock_elem:
-                product['in_stock'] = 'in stock' in stock_elem.get_text().lower()
-                break
+        stock_elem = self._select_first(parser, element, selectors, 'in_stock_selectors')
+        if stock_elem is not None:
+            product['in_stock'] = 'in stock' in parser.text(stock_elem).lower()
         
-        for selector in selectors.get('vendor_selectors', []):
-            vendor_elem = element.select_one(selector)
-            if vendor_elem:
-                product['vendor'] = vendor_elem.get_text().strip()
-                break
+        vendor_elem = self._select_first(parser, element, selectors, 'vendor_selectors')
+        if vendor_elem is not None:
+            product['vendor'] = parser.text(vendor_elem).strip()
         
-        for selector in selectors.get('review_count_selectors', []):
-            review_elem = element.select_one(selector)
-            if review_elem:
-                product['review_count'] = self._clean_price(review_elem.get_text())
-                break
+        review_elem = self._select_first(parser, element, selectors, 'review_count_selectors')
+        if review_elem is not None:
+            review_count = parse_count(parser.text(review_elem), self.locale)
+            if review_count is not None:
+                product['review_count'] = review_count
 
-        for selector in selectors.get('category_selectors', []):
-            category_elem = element.select_one(selector)
-            if category_elem:
-                product['category'] = category_elem.get_text().strip()
-                break
+        category_elem = self._select_first(parser, element, selectors, 'category_selectors')
+        if category_elem is not None:
+            product['category'] = parser.text(category_elem).strip()
 
-        for selector in selectors.get('original_price_selectors', []):
-            orig_price_elem = element.select_one(selector)
-            if orig_price_elem:
-                product['original_price'] = self._clean_price(orig_price_elem.get_text())
-                break
+        orig_price_elem = self._select_first(parser, element, selectors, 'original_price_selectors')
+        if orig_price_elem is not None:
+            original_price = parse_price(parser.text(orig_price_elem), self.locale)
+            if original_price is not None:
+                product['original_price'] = original_price.amount
         
         return product if product else None
     
-    def _clean_price(self, price_text):
-        """Creative price cleaning"""
-        import re
-        # Extract numbers and decimal points
-        matches = re.findall(r'[\d,]+\.?\d*', price_text)
-        return matches[0] if matches else "0"
-    
-    def _clean_rating(self, rating_text):
-        """Creative rating cleaning"""
-        import re
-        matches = re.findall(r'[\d\.]+', rating_text)
-        return matches[0] if matches else "0"
\ No newline at end of file
+    def _within_max_price(self, product, max_price):
+        """Same 10% tolerance as CreativeScraper; unparseable prices pass"""
+        price = parse_number(product.get('price'), self.locale)
+        return not max_price or price is None or price <= max_price * 1.1
\ No newline at end of file
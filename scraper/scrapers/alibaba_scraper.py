@@ -2,6 +2,8 @@ from . import BaseScraper
 import urllib.parse
 
 class AlibabaScraper(BaseScraper):
+    site_name = 'alibaba'
+
     async def scrape(self, params):
         print("⚠️ Alibaba scraper not yet implemented")
         return {'source': 'alibaba', 'products': []}
\ No newline at end of file
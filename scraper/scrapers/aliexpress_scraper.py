@@ -2,6 +2,8 @@ from . import BaseScraper
 import urllib.parse
 
 class AliExpressScraper(BaseScraper):
+    site_name = 'aliexpress'
+
     async def scrape(self, params):
         print("⚠️ AliExpress scraper not yet implemented")
         return {'source': 'aliexpress', 'products': []}
\ No newline at end of file
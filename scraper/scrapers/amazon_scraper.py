@@ -1,16 +1,28 @@
 from . import BaseScraper
+import asyncio
+import logging
+import re
 import urllib.parse
-import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PAGES = 5
+DEFAULT_CRAWL_CONCURRENCY = 3
+ASIN_PATTERN = re.compile(r'/dp/([A-Z0-9]{10})')
 
 class AmazonScraper(BaseScraper):
+    site_name = 'amazon'
+
     async def scrape(self, params):
+        if params.get('target_results') or params.get('max_pages'):
+            return await self.crawl(params)
+
         print("🚀 Starting Amazon scrape with httpx...")
         search_url = self.build_url(params)
         
         try:
-            html = await self.fetch_page(search_url)
-            if html:
-                products = self.creative_parse(html, self.get_selectors())
+            products = await self.page_products(search_url, self.get_selectors())
+            if products:
                 return {
                     'source': 'amazon',
                     'products': products,
@@ -18,10 +30,92 @@ class AmazonScraper(BaseScraper):
                 }
         except Exception as e:
             print(f"💥 Amazon scraping error: {e}")
+            # Reported so the orchestrator's circuit breaker counts the failure
+            return {'source': 'amazon', 'products': [], 'search_params': params, 'error': str(e)}
         
         return {'source': 'amazon', 'products': [], 'search_params': params}
+
+    async def crawl(self, params, concurrency=DEFAULT_CRAWL_CONCURRENCY):
+        """Fetch several result pages concurrently until ``target_results``
+        products within ``max_price`` are found or ``max_pages`` is spent"""
+        target = params.get('target_results')
+        max_pages = params.get('max_pages') or DEFAULT_MAX_PAGES
+        max_price = params.get('max_price')
+        selectors = self.get_selectors()
+        logger.info("🚀 Starting Amazon crawl: up to %d pages, target %s products", max_pages, target or 'all')
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(page):
+            async with semaphore:
+                return page, await self.page_products(self.build_url(params, page), selectors, limit=None)
+
+        tasks = {page: asyncio.ensure_future(fetch(page)) for page in range(1, max_pages + 1)}
+        pages = {}
+        errors = []
+        seen = set()
+        matching = 0
+        try:
+            for next_done in asyncio.as_completed(list(tasks.values())):
+                try:
+                    page, products = await next_done
+                except asyncio.CancelledError:
+                    # The crawl itself being cancelled (e.g. a search deadline)
+                    # propagates; only pages cancelled below are skipped
+                    if asyncio.current_task().cancelling():
+                        raise
+                    continue
+                except Exception as e:
+                    logger.exception("💥 Amazon crawl page error: %s", e)
+                    errors.append(str(e))
+                    continue
+                pages[page] = products
+                if not products:
+                    # Past the last results page; later pages will be empty too
+                    for later, task in tasks.items():
+                        if later > page:
+                            task.cancel()
+                for index, product in enumerate(products):
+                    key = self._product_key(product, page, index)
+                    if key not in seen:
+                        seen.add(key)
+                        matching += self._within_max_price(product, max_price)
+                if target and matching >= target:
+                    break
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        # Keep page order and drop products repeated across pages
+        merged, seen = [], set()
+        for page in sorted(pages):
+            for index, product in enumerate(pages[page]):
+                key = self._product_key(product, page, index)
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(product)
+
+        result = {
+            'source': 'amazon',
+            'products': merged,
+            'search_params': params,
+            'pages_fetched': sorted(pages),
+        }
+        if errors and not pages:
+            result['error'] = errors[0]
+        return result
+
+    @staticmethod
+    def _product_key(product, page, index):
+        """ASIN, else link, else title; products with none of them are only
+        the same as themselves (their position on the results page)"""
+        link = product.get('link') or ''
+        match = ASIN_PATTERN.search(link)
+        if match:
+            return match.group(1)
+        return link.split('?')[0] or product.get('title') or (page, index)
     
-    def build_url(self, params):
+    def build_url(self, params, page=1):
         base_url = "https://www.amazon.com/s"
         query = urllib.parse.quote(params['search_input'])
         category_map = {
@@ -55,76 +149,8 @@ class AmazonScraper(BaseScraper):
         
         if params.get('sort_by') in sort_map:
             url += f"&s={sort_map[params['sort_by']]}"
+
+        if page > 1:
+            url += f"&page={page}"
         
         return url
-    
-    def get_selectors(self):
-        return {
-            'product_selectors': [
-                'div[data-component-type="s-search-result"]',
-                '.s-result-item',
-                '.s-main-slot .s-card-container'
-            ],
-            'title_selectors': [
-                'h2 a span',
-                '.a-size-medium',
-                '.a-text-normal'
-            ],
-            'description_selectors': [
-                '.a-size-base-plus',
-                '.a-size-base',
-                '.a-text-normal'
-            ]
-            ,
-            'price_selectors': [
-                '.a-price-whole',
-                '.a-offscreen',
-                '.a-price .a-offscreen'
-            ],
-            'rating_selectors': [
-                '.a-icon-alt',
-                '.a-star-small',
-                '.a-size-small .a-color-base'
-            ],
-            'link_selectors': [
-                'h2 a',
-                '.a-link-normal',
-                '.a-text-normal'
-            ],
-            'image_selectors': [
-                'img.s-image',
-                '.s-image',
-                '.a-section img'
-            ],
-            'shipping_selectors': [
-                '.a-color-secondary .a-size-base',
-                '.s-shipping-width',
-                '.a-text-normal .a-color-secondary'
-            ],
-            'in_stock_selectors': [
-                '.a-color-success',
-                '.s-stock-status',
-                '.a-text-success'
-            ],
-            'category_selectors': [
-                '#searchDropdownBox',
-                '.a-dropdown-prompt',
-                '.s-navigation-item'
-            ],
-            'review_count_selectors': [
-                '.a-size-base',
-                # '.a-size-mini',
-                '.s-review-count',
-                '.a-text-normal .a-size-base'
-            ],
-            'original_price_selectors': [
-                '.a-text-price .a-offscreen',
-                '.s-price .a-text-price',
-                '.a-price .a-text-price'
-            ],
-            'vendor_selectors': [
-                '.a-size-base.a-color-secondary',
-                '.s-merchant-name',
-                '.a-text-normal .a-color-secondary'
-            ]
-        }
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""Per-source circuit breakers for the orchestrator.
+
+A retailer that keeps failing (errors, blocked pages, blown deadlines) is
+not called again until its cooldown has passed; searches meanwhile answer
+without it instead of waiting on it. After the cooldown a single trial
+scrape is let through: success closes the breaker, failure re-opens it.
+"""
+
+import time
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 60.0
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures"""
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, cooldown=DEFAULT_COOLDOWN,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self._opened_at = None
+        # A half-open trial scrape is in flight
+        self._trial = False
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return CLOSED
+        if self.clock() - self._opened_at < self.cooldown:
+            return OPEN
+        return HALF_OPEN
+
+    def retry_after(self):
+        """Seconds until a trial call will be allowed (0 when not open)"""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (self.clock() - self._opened_at))
+
+    def allow(self):
+        """Whether a call may go ahead; claims the trial slot when half-open"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == OPEN or self._trial:
+            return False
+        self._trial = True
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial = False
+        # A failed trial re-opens straight away
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            self._opened_at = self.clock()
+
+    def release(self):
+        """The call ended without a verdict (e.g. cancelled); free the trial slot"""
+        self._trial = False
+
+    def to_dict(self):
+        return {'state': self.state, 'failures': self.failures, 'retry_after': round(self.retry_after(), 1)}
@@ -1,95 +1,286 @@
 import asyncio
-import httpx
-from scrapers.amazon_scraper import AmazonScraper
-from scrapers.aliexpress_scraper import AliExpressScraper
-from scrapers.alibaba_scraper import AlibabaScraper
-from scrapers.walmart_scraper import WalmartScraper
-from data_processor import DataProcessor
+import logging
+from scrapers.circuit_breaker import DEFAULT_COOLDOWN, DEFAULT_FAILURE_THRESHOLD, CircuitBreaker
+from scrapers.http_client import ClientManager
+from scrapers.metrics import metrics
+from scrapers.rate_limiter import RateLimiter
+from scrapers.registry import load_scraper_class, resolve_sources
+from scrapers.selector_stats import SelectorStats
+from data_processor import DataProcessor, ProductTable
+from dedup import dedupe_offers
+from query_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# Searches from batch requests that may run at once across the whole process;
+# each one still fans out to every retailer under the per-host limits
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# Per-source outcomes that leave a search's results incomplete
+PARTIAL_STATUSES = ('timeout', 'circuit_open', 'error')
+
+
+class ScrapeResults(list):
+    """The merged products of ``scrape_all``, plus how each source fared.
+
+    ``sources`` maps each source to ok, empty, error, timeout or
+    circuit_open; ``partial`` lists the ones whose products are missing.
+    """
+
+    def __init__(self, products=(), sources=None):
+        super().__init__(products)
+        self.sources = sources or {}
+
+    @property
+    def partial(self):
+        return [source for source, status in self.sources.items() if status in PARTIAL_STATUSES]
 
 class CreativeScraper:
-    def __init__(self):
-        self.scrapers = {
-            'amazon': AmazonScraper(),
-            'aliexpress': AliExpressScraper(),
-            'alibaba': AlibabaScraper(),
-            'walmart': WalmartScraper()
+    def __init__(self, client_manager=None, selector_stats=None, response_cache=None,
+                 rate_limiter=None, parse_executor=None, parse_memo=None, stream_parse=False,
+                 selector_registry=None, dedupe=True,
+                 batch_concurrency=DEFAULT_BATCH_CONCURRENCY, sources=None, deadline=None,
+                 hedger=None, breaker_threshold=DEFAULT_FAILURE_THRESHOLD, breaker_cooldown=DEFAULT_COOLDOWN):
+        # The orchestrator owns the pooled clients unless the caller (e.g. the
+        # API lifespan) hands in a manager it is responsible for closing.
+        self._owns_client_manager = client_manager is None
+        self.client_manager = client_manager or ClientManager()
+        self.selector_stats = selector_stats if selector_stats is not None else SelectorStats()
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.parse_executor = parse_executor
+        self.parse_memo = parse_memo
+        # Default sources for searches that don't name their own
+        self.sources = resolve_sources(sources)
+        self._shared = {
+            'client_manager': self.client_manager,
+            'selector_stats': self.selector_stats,
+            'response_cache': self.response_cache,
+            'rate_limiter': self.rate_limiter,
+            'parse_executor': self.parse_executor,
+            'parse_memo': self.parse_memo,
+            'stream_parse': stream_parse,
+            'selector_registry': selector_registry,
+            'hedger': hedger,
         }
+        # Scrapers are imported and built the first time their source is used
+        self.scrapers = {}
         self.processor = DataProcessor()
+        # Collapse the same item listed by several retailers to its cheapest offer
+        self.dedupe = dedupe
+        # Shared by every scrape_batch call, so concurrent batches split one budget
+        self._batch_slots = asyncio.Semaphore(batch_concurrency)
+        # Seconds scrape_all waits for sources before answering without the
+        # stragglers; None waits for every source
+        self.deadline = deadline
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.breakers = {}
+
+    def get_scraper(self, source):
+        scraper = self.scrapers.get(source)
+        if scraper is None:
+            scraper = self.scrapers[source] = load_scraper_class(source)(**self._shared)
+        return scraper
+
+    def get_breaker(self, source):
+        breaker = self.breakers.get(source)
+        if breaker is None:
+            breaker = self.breakers[source] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+        return breaker
+
+    def _selected(self, search_params):
+        """(name, scraper) pairs for the search's ``sources`` or the defaults"""
+        sources = resolve_sources(search_params.get('sources')) if search_params.get('sources') else self.sources
+        return [(source, self.get_scraper(source)) for source in sources]
+
+    async def aclose(self):
+        if self._owns_client_manager:
+            await self.client_manager.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
         
-    async def scrape_all(self, search_params):
-        """Creative approach: Run all scrapers concurrently with httpx"""
-        print(f"🎯 Starting scrape with params: {search_params}")
-        
-        tasks = []
-        for site_name, scraper in self.scrapers.items():
-            task = self._scrape_with_fallback(scraper, search_params, site_name)
-            tasks.append(task)
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    async def scrape_all(self, search_params, deadline=None):
+        """Creative approach: Run all scrapers concurrently with httpx.
+
+        Sources still running after ``deadline`` seconds (the search's
+        ``deadline``, else the scraper's default) are cancelled and the
+        others are returned as ``ScrapeResults`` with those marked partial.
+        """
+        logger.info("🎯 Starting scrape with params: %s", search_params)
+        deadline = deadline or search_params.get('deadline') or self.deadline
+
+        tasks = {
+            site_name: asyncio.ensure_future(self._scrape_with_fallback(scraper, search_params, site_name))
+            for site_name, scraper in self._selected(search_params)
+        }
+        pending = set()
+        if tasks:
+            try:
+                _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+            finally:
+                for task in tasks.values():
+                    task.cancel()
+
+        results = []
+        statuses = {}
+        for site_name, task in tasks.items():
+            if task in pending:
+                # Too slow counts against the source like a failure would
+                self.get_breaker(site_name).record_failure()
+                metrics.inc('scraper_scrapes_total', site=site_name, outcome='timeout')
+                logger.warning("⏱️ %s missed the %gs deadline; answering without it", site_name, deadline)
+                statuses[site_name] = 'timeout'
+                continue
+            result = task.result()
+            statuses[site_name] = result.get('status', 'ok')
+            results.append(result)
         
         # Process and merge results
-        final_results = self._creative_merge(results, search_params)
-        print(f"✅ Scraping complete. Found {len(final_results)} products")
+        final_results = ScrapeResults(self._creative_merge(results, search_params), statuses)
+        logger.info("✅ Scraping complete. Found %d products", len(final_results))
         return final_results
     
+    async def scrape_stream(self, search_params):
+        """Yield each source's standardized products as soon as it finishes,
+        then a final merged, filtered and sorted frame"""
+        logger.info("🎯 Starting streaming scrape with params: %s", search_params)
+
+        tasks = [
+            asyncio.ensure_future(self._scrape_with_fallback(scraper, search_params, site_name))
+            for site_name, scraper in self._selected(search_params)
+        ]
+        merged_results = ProductTable()
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                processed = self._standardize_result(result)
+                merged_results.extend(processed)
+                frame = {'type': 'source', 'source': result.get('source'), 'products': processed.rows}
+                if result.get('error'):
+                    frame['error'] = result['error']
+                yield frame
+        finally:
+            # The client may disconnect mid-stream; don't leave scrapes running
+            for task in tasks:
+                task.cancel()
+
+        final_results = self._finalize(merged_results, search_params)
+        logger.info("✅ Streaming scrape complete. Found %d products", len(final_results))
+        yield {'type': 'final', 'products': final_results, 'count': len(final_results)}
+
+    async def scrape_batch(self, queries):
+        """Run many searches under the shared batch budget, yielding a
+        ``{'type': 'result', 'index': i, ...}`` frame per query as it finishes.
+
+        Queries that normalize to the same key are scraped once and answered
+        together; a failed search yields an ``error`` frame for its indices.
+        """
+        indices = {}
+        for index, params in enumerate(queries):
+            indices.setdefault(normalize_query(params), []).append(index)
+
+        async def run(key, params):
+            async with self._batch_slots:
+                try:
+                    return key, await self.scrape_all(params), None
+                except Exception as e:
+                    logger.warning("⚠️ Batch search %r failed: %s", params.get('search_input'), e)
+                    return key, None, str(e)
+
+        tasks = [
+            asyncio.ensure_future(run(key, queries[group[0]]))
+            for key, group in indices.items()
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                key, products, error = await next_done
+                for index in indices[key]:
+                    if error is not None:
+                        yield {'type': 'result', 'index': index, 'error': error}
+                    else:
+                        yield {'type': 'result', 'index': index, 'products': products, 'count': len(products),
+                               'partial': products.partial}
+        finally:
+            for task in tasks:
+                task.cancel()
+
     async def _scrape_with_fallback(self, scraper, params, site_name):
-        """Creative fallback strategy"""
+        """Creative fallback strategy; a source whose circuit breaker is
+        open is skipped until its cooldown has passed"""
+        breaker = self.get_breaker(site_name)
+        if not breaker.allow():
+            metrics.inc('scraper_scrapes_total', site=site_name, outcome='circuit_open')
+            logger.info("🔌 Skipping %s for %.0fs after repeated failures", site_name, breaker.retry_after())
+            return {"source": site_name, "products": [], "status": "circuit_open",
+                    "error": f"{site_name} is temporarily disabled after repeated failures"}
         try:
-            return await scraper.scrape(params)
+            result = await scraper.scrape(params)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
         except Exception as e:
-            print(f"⚠️ Fallback for {site_name}: {e}")
-            return {"source": site_name, "products": [], "error": str(e)}
+            breaker.record_failure()
+            metrics.inc('scraper_scrapes_total', site=site_name, outcome='error')
+            logger.warning("⚠️ Fallback for %s: %s", site_name, e)
+            return {"source": site_name, "products": [], "status": "error", "error": str(e)}
+        if result.get('error'):
+            breaker.record_failure()
+            status = 'error'
+        else:
+            breaker.record_success()
+            status = 'ok' if result.get('products') else 'empty'
+        metrics.inc('scraper_scrapes_total', site=site_name, outcome=status)
+        return {**result, 'status': status}
     
+    def _standardize_result(self, result):
+        if isinstance(result, dict) and 'products' in result:
+            with metrics.timer('scraper_stage_seconds', stage='standardize'):
+                return self.processor.standardize_table(result['products'], result.get('source'))
+        return ProductTable()
+
     def _creative_merge(self, results, search_params):
         """Creatively merge results from different sources"""
-        merged_results = []
+        merged_results = ProductTable()
         
         for result in results:
-            if isinstance(result, dict) and 'products' in result:
-                processed = self.processor.standardize_data(result['products'], result.get('source'))
-                merged_results.extend(processed)
+            merged_results.extend(self._standardize_result(result))
         
+        return self._finalize(merged_results, search_params)
+
+    def _finalize(self, merged_results, search_params):
+        if self.dedupe:
+            with metrics.timer('scraper_stage_seconds', stage='dedupe'):
+                merged_results = dedupe_offers(merged_results)
         return self._apply_filters_creatively(merged_results, search_params)
     
     def _apply_filters_creatively(self, products, search_params):
-        """Apply filters with creative tolerance"""
+        """Apply filters with creative tolerance on pre-parsed price columns"""
+        if not isinstance(products, ProductTable):
+            products = ProductTable(products)
         if not products:
             return []
-            
-        filtered_products = []
-        
-        for product in products:
-            # Creative price matching
-            if 'price' in product and search_params.get('max_price'):
-                try:
-                    price_str = str(product['price']).replace('$', '').replace(',', '').split()[0]
-                    price = float(price_str)
-                    if price <= search_params['max_price'] * 1.1:  # 10% tolerance
-                        filtered_products.append(product)
-                except (ValueError, IndexError):
-                    # If price parsing fails, include the product creatively
-                    filtered_products.append(product)
-            else:
-                filtered_products.append(product)
+
+        if search_params.get('max_price'):
+            # 10% tolerance; products whose price didn't parse are kept
+            with metrics.timer('scraper_stage_seconds', stage='filter'):
+                products = products.take(products.filter_max_price(search_params['max_price']))
         
         # Creative sorting
-        return self._creative_sort(filtered_products, search_params.get('sort_by', 'relevant'))
+        return self._creative_sort(products, search_params.get('sort_by', 'relevant'), search_params.get('limit'))
     
-    def _creative_sort(self, products, sort_by):
-        """Creative sorting based on available data"""
+    def _creative_sort(self, products, sort_by, limit=None):
+        """Creative sorting based on available data; ``limit`` keeps only
+        the first N (e.g. the cheapest N) without sorting everything"""
+        if not isinstance(products, ProductTable):
+            products = ProductTable(products)
         if not products:
             return []
-            
-        sort_strategies = {
-            'price_low_to_high': lambda x: float(str(x.get('price', 0)).replace('$', '').replace(',', '') or 0),
-            'price_high_to_low': lambda x: -float(str(x.get('price', 0)).replace('$', '').replace(',', '') or 0),
-            'highest_rating': lambda x: -float(x.get('rating', 0)),
-            'most_popular': lambda x: -int(x.get('reviews', 0)),
-            'relevant': lambda x: (-float(x.get('rating', 0)), -int(x.get('reviews', 0)))
-        }
-        
-        try:
-            return sorted(products, key=sort_strategies.get(sort_by, sort_strategies['relevant']))
-        except Exception as e:
-            print(f"⚠️ Sorting error: {e}, returning unsorted")
-            return products
\ No newline at end of file
+        with metrics.timer('scraper_stage_seconds', stage='sort'):
+            if limit:
+                return products.top_k(limit, sort_by)
+            return products.sorted_rows(sort_by)
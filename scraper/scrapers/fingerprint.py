@@ -0,0 +1,141 @@
+"""Content fingerprints for skipping unchanged work.
+
+``page_fingerprint`` hashes a results page after stripping the tokens that
+change on every request (scripts, nonces, request ids, timestamps), so two
+fetches of an unchanged listing hash the same. ``ParseMemo`` keys parsed
+product lists on that hash, and ``DeltaTracker`` compares per-product
+fingerprints between re-scrapes of a query.
+"""
+
+import hashlib
+import json
+import re
+from collections import OrderedDict
+
+DEFAULT_MEMO_ENTRIES = 256
+DEFAULT_TRACKED_QUERIES = 1024
+
+_TRACKING_PARAMS = r'(?:qid|sr|crid|sprefix|ref_|pd_rd_\w+|pf_rd_\w+|session[-_]?id|sid)=[^&"\'\s]*'
+# Each pattern starts with a literal so the regex engine can skip ahead
+# quickly; a fingerprint costs a small fraction of a parse.
+VOLATILE_PATTERNS = [
+    re.compile(r'<script\b.*?</script\s*>', re.IGNORECASE | re.DOTALL),
+    re.compile(r'<style\b.*?</style\s*>', re.IGNORECASE | re.DOTALL),
+    re.compile(r'<!--.*?-->', re.DOTALL),
+    # Per-request attributes: CSP nonces, CSRF tokens, tracking ids
+    re.compile(r' (?:nonce|data-csrf[\w-]*|data-request-id|data-csa-c-[\w-]+)="[^"]*"'),
+    # Per-request query parameters in links (Amazon qid/sr/crid/ref, sessions)
+    re.compile(r'\?' + _TRACKING_PARAMS),
+    re.compile(r'&(?:amp;)?' + _TRACKING_PARAMS),
+    re.compile(r'/ref=[\w.-]+'),
+    # Attribute values that are epoch timestamps or long random hex tokens
+    re.compile(r'="(?:\d{10,13}|[0-9a-fA-F]{24,})"'),
+]
+URL_NOISE_PATTERN = re.compile(r'/ref=[^/?]*|\?.*$')
+
+
+def page_fingerprint(html):
+    """Hash of ``html`` with volatile tokens removed"""
+    for pattern in VOLATILE_PATTERNS:
+        html = pattern.sub('', html)
+    html = ' '.join(html.split())
+    return hashlib.blake2b(html.encode('utf-8', 'replace'), digest_size=16).hexdigest()
+
+
+def _selectors_digest(selectors):
+    return hashlib.blake2b(json.dumps(selectors, sort_keys=True).encode('utf-8'), digest_size=8).hexdigest()
+
+
+class ParseMemo:
+    """LRU of parsed product lists keyed by site, page fingerprint, selector
+    config and limit; a hit skips ``creative_parse`` entirely"""
+
+    def __init__(self, max_entries=DEFAULT_MEMO_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, site, html, selectors, limit):
+        return site, page_fingerprint(html), _selectors_digest(selectors), limit
+
+    def get(self, key):
+        products = self._entries.get(key)
+        if products is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        # Callers may annotate the dicts they get back
+        return [dict(p) for p in products]
+
+    def put(self, key, products):
+        self._entries[key] = [dict(p) for p in products]
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def _as_dict(product):
+    return product.to_dict() if hasattr(product, 'to_dict') else product
+
+
+def product_key(product):
+    """Stable identity of a listing: its URL without tracking parts, else
+    source plus normalized title"""
+    url = product.get('url') or product.get('link')
+    if url and url != '#':
+        return URL_NOISE_PATTERN.sub('', url)
+    title = ' '.join(str(product.get('title') or '').lower().split())
+    return f"{product.get('source')}:{title}"
+
+
+def product_fingerprint(product):
+    """What counts as a change for a listing: title, price and stock"""
+    return (product.get('title'), product.get('price'), product.get('in_stock'))
+
+
+class DeltaTracker:
+    """Remembers the last result set per query and reports what changed.
+
+    ``update`` returns ``{'added': [...], 'removed': [...], 'changed': [...],
+    'unchanged': n}``. On the first scrape of a query every product is added.
+    """
+
+    def __init__(self, max_queries=DEFAULT_TRACKED_QUERIES):
+        self.max_queries = max_queries
+        self._snapshots = OrderedDict()
+
+    def update(self, query_key, products):
+        previous = self._snapshots.get(query_key, {})
+        current = {}
+        added, changed = [], []
+        unchanged = 0
+        for product in products:
+            key = product_key(product)
+            if key in current:
+                continue
+            fingerprint = product_fingerprint(product)
+            current[key] = fingerprint
+            before = previous.get(key)
+            if before is None:
+                added.append(_as_dict(product))
+            elif before != fingerprint:
+                changed.append({
+                    'key': key,
+                    'previous_price': before[1],
+                    'previous_in_stock': before[2],
+                    'product': _as_dict(product),
+                })
+            else:
+                unchanged += 1
+        removed = [key for key in previous if key not in current]
+
+        self._snapshots[query_key] = current
+        self._snapshots.move_to_end(query_key)
+        while len(self._snapshots) > self.max_queries:
+            self._snapshots.popitem(last=False)
+        return {'added': added, 'removed': removed, 'changed': changed, 'unchanged': unchanged}
@@ -0,0 +1,119 @@
+"""Hedged requests: a duplicate fetch for requests slower than usual.
+
+``Hedger`` keeps a rolling window of request latencies per site. When a
+request is still running after that site's p95 it starts the same request
+a second time and uses whichever answers first, cancelling the other. Only
+about one request in twenty is slower than p95, so the extra load stays
+around 5% while a single stuck connection no longer sets the tail.
+
+Only the first copy's latency is sampled; when it loses, the time it had
+been running when cancelled goes in as a lower bound, so hedging doesn't
+pull the p95 down and hedge ever more often. Hedges are also capped at
+``max_hedge_ratio`` of all requests.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+
+from .metrics import metrics
+
+DEFAULT_QUANTILE = 0.95
+DEFAULT_WINDOW = 200
+# No hedging until a site has this many samples to estimate its p95 from
+DEFAULT_MIN_SAMPLES = 20
+# Never hedge sooner than this, however fast the site usually is
+DEFAULT_MIN_DELAY = 0.05
+# At most this share of requests is sent twice
+DEFAULT_MAX_HEDGE_RATIO = 0.05
+
+
+class Hedger:
+    def __init__(self, quantile=DEFAULT_QUANTILE, window=DEFAULT_WINDOW,
+                 min_samples=DEFAULT_MIN_SAMPLES, min_delay=DEFAULT_MIN_DELAY,
+                 max_hedge_ratio=DEFAULT_MAX_HEDGE_RATIO):
+        self.quantile = quantile
+        self.window = window
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_hedge_ratio = max_hedge_ratio
+        self._latencies = {}
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def record(self, key, seconds):
+        samples = self._latencies.get(key)
+        if samples is None:
+            samples = self._latencies[key] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def delay(self, key):
+        """Seconds to wait before hedging ``key``'s requests, or None"""
+        samples = self._latencies.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, math.ceil(self.quantile * len(ordered)) - 1)
+        return max(self.min_delay, ordered[index])
+
+    async def _timed(self, key, request):
+        started = time.perf_counter()
+        result = await request()
+        self.record(key, time.perf_counter() - started)
+        return result
+
+    async def run(self, key, request, hedge_request=None):
+        """Await ``request()`` (a coroutine factory), hedging it past the p95.
+
+        The duplicate is made with ``hedge_request()`` when given (e.g. one
+        that waits for its own rate-limiter slot), else ``request()``. If
+        one copy fails the other is still awaited; the error is raised only
+        when both fail.
+        """
+        self.requests += 1
+        delay = self.delay(key)
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(self._timed(key, request))
+        if delay is None:
+            return await primary
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+        except BaseException:
+            primary.cancel()
+            raise
+        if done:
+            return primary.result()
+        if self.hedged >= self.max_hedge_ratio * self.requests:
+            return await primary
+
+        self.hedged += 1
+        hedge = asyncio.ensure_future((hedge_request or request)())
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        won = task is hedge
+                        self.hedge_wins += won
+                        metrics.inc('scraper_fetch_hedges_total', site=key, winner='hedge' if won else 'primary')
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+                if task is primary:
+                    # Still running this long; a lower bound of its latency
+                    self.record(key, time.perf_counter() - started)
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+            'delays': {key: self.delay(key) for key in self._latencies},
+        }
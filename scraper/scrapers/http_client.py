@@ -0,0 +1,90 @@
+import asyncio
+import urllib.parse
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_HOST_LIMIT = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+class ClientManager:
+    """Process-wide pool of keep-alive httpx clients, one per host.
+
+    Every retailer host gets its own ``httpx.AsyncClient`` so its connection
+    pool (and therefore the number of open sockets) can be bounded on its own.
+    """
+
+    def __init__(self, default_limit=DEFAULT_HOST_LIMIT, host_limits=None,
+                 http2=False, timeout=DEFAULT_TIMEOUT,
+                 keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY):
+        self.default_limit = default_limit
+        self.host_limits = dict(host_limits or {})
+        self.http2 = http2 and self._http2_available()
+        self.timeout = timeout
+        self.keepalive_expiry = keepalive_expiry
+        self._clients = {}
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    @staticmethod
+    def _http2_available():
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("⚠️ HTTP/2 requested but the 'h2' package is missing, using HTTP/1.1")
+            return False
+        return True
+
+    @staticmethod
+    def host_key(url):
+        parts = urllib.parse.urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def limit_for(self, host_key):
+        netloc = urllib.parse.urlsplit(host_key).netloc
+        return self.host_limits.get(netloc, self.host_limits.get(host_key, self.default_limit))
+
+    def _build_client(self, host_key):
+        # Imported here so building the orchestrator doesn't pay for httpx
+        import httpx
+
+        limit = self.limit_for(host_key)
+        limits = httpx.Limits(
+            max_connections=limit,
+            max_keepalive_connections=limit,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=limits,
+            http2=self.http2,
+            follow_redirects=True,
+        )
+
+    async def get_client(self, url):
+        """Return the shared client for the host of ``url``"""
+        if self._closed:
+            raise RuntimeError("ClientManager is closed")
+        key = self.host_key(url)
+        client = self._clients.get(key)
+        if client is None:
+            async with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._build_client(key)
+                    self._clients[key] = client
+        return client
+
+    def stats(self):
+        return {key: self.limit_for(key) for key in self._clients}
+
+    async def aclose(self):
+        """Close every pooled client; safe to call more than once"""
+        self._closed = True
+        clients, self._clients = list(self._clients.values()), {}
+        await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
@@ -0,0 +1,275 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.parse
+
+# Rendered widths; requests for other widths get the next larger one
+THUMBNAIL_WIDTHS = (128, 256, 512)
+THUMBNAIL_FORMAT = 'WEBP'
+THUMBNAIL_QUALITY = 80
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_CONCURRENCY = 8
+# Larger source images are refused rather than buffered
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+MEDIA_TYPES = {
+    'webp': 'image/webp', 'jpeg': 'image/jpeg', 'jpg': 'image/jpeg',
+    'png': 'image/png', 'gif': 'image/gif', 'avif': 'image/avif',
+}
+
+
+class ImageUnavailable(Exception):
+    """The image could not be fetched, was refused or could not be decoded"""
+
+
+class ImageCache:
+    """Product image downloads and resized thumbnails in an on-disk LRU.
+
+    Thumbnails are content-addressed (``<digest>-<width>.webp``, digest of
+    the original bytes), so the same picture listed under several URLs is
+    stored once; a small sidecar per URL records which digest it resolved
+    to. Downloads share a concurrency limit and concurrent requests for one
+    URL share a download. Like the response cache, file mtimes double as
+    last-access times for eviction.
+
+    Resizing needs Pillow; without it the original image is cached and
+    served at every width.
+    """
+
+    def __init__(self, directory, client_manager=None, widths=THUMBNAIL_WIDTHS,
+                 max_bytes=DEFAULT_MAX_BYTES, concurrency=DEFAULT_CONCURRENCY, allowed_hosts=None):
+        self.directory = directory
+        self.client_manager = client_manager
+        self.widths = tuple(sorted(widths))
+        self.max_bytes = max_bytes
+        # Only fetch from these hosts (None allows any), so the proxy can't be
+        # pointed at arbitrary URLs
+        self.allowed_hosts = set(allowed_hosts) if allowed_hosts is not None else None
+        self._slots = asyncio.Semaphore(concurrency)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        # file name -> [size in bytes, last access time]
+        self._index = {}
+        self._total_bytes = 0
+        self.resizing = self._pillow_available()
+        os.makedirs(os.path.join(directory, 'urls'), exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def _pillow_available():
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            print("⚠️ Pillow is not installed; product images are cached but not resized")
+            return False
+        return True
+
+    @staticmethod
+    def url_key(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def snap_width(self, width):
+        """Smallest rendered width covering ``width`` (the largest one past that)"""
+        return next((w for w in self.widths if w >= width), self.widths[-1])
+
+    def check_url(self, url):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ImageUnavailable(f"Not an image URL: {url!r}")
+        if self.allowed_hosts is not None and parts.hostname not in self.allowed_hosts:
+            raise ImageUnavailable(f"Images from {parts.hostname} are not proxied")
+
+    def _image_path(self, digest, width, ext):
+        return os.path.join(self.directory, digest[:2], f"{digest}-{width}.{ext}")
+
+    def _sidecar_path(self, url_key):
+        return os.path.join(self.directory, 'urls', url_key + '.json')
+
+    def _scan(self):
+        for root, _, files in os.walk(self.directory):
+            if os.path.basename(root) == 'urls':
+                continue
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                self._index[name] = [stat.st_size, stat.st_mtime]
+                self._total_bytes += stat.st_size
+
+    @staticmethod
+    def _atomic_write(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _store(self, path, data):
+        self._atomic_write(path, data)
+        name = os.path.basename(path)
+        with self._lock:
+            previous = self._index.get(name)
+            if previous:
+                self._total_bytes -= previous[0]
+            self._index[name] = [len(data), time.time()]
+            self._total_bytes += len(data)
+
+    def _touch(self, path):
+        now = time.time()
+        with self._lock:
+            entry = self._index.get(os.path.basename(path))
+            if entry is None:
+                return False
+            entry[1] = now
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            return False
+        return True
+
+    def _evict(self, keep=None):
+        """Drop least recently used files past ``max_bytes``, sparing the
+        thumbnails of digest ``keep`` that are about to be served"""
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return
+            victims = []
+            excess = self._total_bytes - self.max_bytes
+            for name, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+                if excess <= 0:
+                    break
+                if keep and name.startswith(keep):
+                    continue
+                victims.append(name)
+                excess -= size
+            for name in victims:
+                self._total_bytes -= self._index.pop(name)[0]
+        for name in victims:
+            try:
+                os.remove(os.path.join(self.directory, name[:2], name))
+            except FileNotFoundError:
+                pass
+
+    def _render(self, data, media_type):
+        """Write the thumbnails of ``data``; returns the sidecar entry"""
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if not self.resizing:
+            ext = media_type.split(';')[0].strip().split('/')[-1]
+            if ext not in MEDIA_TYPES:
+                raise ImageUnavailable(f"Unsupported image type {media_type!r}")
+            path = self._image_path(digest, 0, ext)
+            if not self._touch(path):
+                self._store(path, data)
+            return {'digest': digest, 'ext': ext, 'widths': [0]}
+
+        from PIL import Image, ImageOps, UnidentifiedImageError
+
+        ext = THUMBNAIL_FORMAT.lower()
+        missing = [w for w in self.widths if not self._touch(self._image_path(digest, w, ext))]
+        if missing:
+            try:
+                with Image.open(io.BytesIO(data)) as image:
+                    # Let the JPEG decoder downscale while decoding
+                    image.draft('RGB', (missing[-1], missing[-1]))
+                    image = ImageOps.exif_transpose(image)
+                    image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+                    for width in missing:
+                        thumb = image.copy()
+                        if thumb.width > width:
+                            thumb.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+                        out = io.BytesIO()
+                        thumb.save(out, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY)
+                        self._store(self._image_path(digest, width, ext), out.getvalue())
+            except (UnidentifiedImageError, OSError, ValueError) as e:
+                raise ImageUnavailable(f"Cannot decode image: {e}") from e
+        return {'digest': digest, 'ext': ext, 'widths': list(self.widths)}
+
+    def _lookup(self, url_key, width):
+        """Path of a cached thumbnail for the URL, or None"""
+        try:
+            with open(self._sidecar_path(url_key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if width not in entry['widths']:
+            width = entry['widths'][0]
+        path = self._image_path(entry['digest'], width, entry['ext'])
+        return (path, entry) if self._touch(path) else None
+
+    async def _download(self, url):
+        client = close_client = None
+        if self.client_manager is not None:
+            client = await self.client_manager.get_client(url)
+        else:
+            import httpx
+
+            client = close_client = httpx.AsyncClient(timeout=30.0, follow_redirects=True)
+        try:
+            async with client.stream('GET', url, headers={'Accept': 'image/webp,image/*;q=0.8'}) as response:
+                media_type = response.headers.get('content-type', '')
+                if response.status_code != 200 or not media_type.startswith('image/'):
+                    raise ImageUnavailable(f"{url}: HTTP {response.status_code} {media_type}")
+                chunks, size = [], 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > MAX_IMAGE_BYTES:
+                        raise ImageUnavailable(f"{url}: larger than {MAX_IMAGE_BYTES} bytes")
+                    chunks.append(chunk)
+            return b''.join(chunks), media_type
+        except ImageUnavailable:
+            raise
+        except Exception as e:
+            raise ImageUnavailable(f"{url}: {e}") from e
+        finally:
+            if close_client is not None:
+                await close_client.aclose()
+
+    async def _fetch(self, url, url_key):
+        async with self._slots:
+            data, media_type = await self._download(url)
+        entry = await asyncio.to_thread(self._render, data, media_type)
+        entry['url'] = url
+        await asyncio.to_thread(self._atomic_write, self._sidecar_path(url_key), json.dumps(entry).encode('utf-8'))
+        await asyncio.to_thread(self._evict, entry['digest'])
+        return entry
+
+    async def thumbnail(self, url, width):
+        """``(path, media_type, digest)`` of the URL's image at ``width``,
+        downloading and rendering it first when it isn't cached"""
+        self.check_url(url)
+        width = self.snap_width(width) if self.resizing else 0
+        url_key = self.url_key(url)
+        found = await asyncio.to_thread(self._lookup, url_key, width)
+        if found is None:
+            task = self._inflight.get(url_key)
+            if task is None:
+                task = self._inflight[url_key] = asyncio.ensure_future(self._fetch(url, url_key))
+                task.add_done_callback(lambda _: self._inflight.pop(url_key, None))
+            # A cancelled caller must not cancel the download others wait on
+            await asyncio.shield(task)
+            found = await asyncio.to_thread(self._lookup, url_key, width)
+            if found is None:
+                raise ImageUnavailable(f"{url}: evicted before it could be served")
+        path, entry = found
+        return path, MEDIA_TYPES.get(entry['ext'], 'application/octet-stream'), entry['digest']
+
+    async def warm(self, urls):
+        """Cache the thumbnails of ``urls`` ahead of the first page view"""
+        async def one(url):
+            try:
+                await self.thumbnail(url, self.widths[0])
+                return True
+            except ImageUnavailable as e:
+                print(f"⚠️ Image not cached: {e}")
+                return False
+
+        results = await asyncio.gather(*(one(url) for url in dict.fromkeys(urls) if url))
+        return {'cached': sum(results), 'failed': len(results) - sum(results)}
+
+    def stats(self):
+        return {'files': len(self._index), 'bytes': self._total_bytes, 'max_bytes': self.max_bytes,
+                'resizing': self.resizing}
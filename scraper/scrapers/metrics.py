@@ -0,0 +1,155 @@
+"""Lightweight in-process metrics with Prometheus text exposition.
+
+Instrumented code calls ``metrics.inc``/``metrics.observe``/``metrics.timer``
+on the process-wide ``metrics`` registry. While ``metrics.enabled`` is False
+(the default) those calls return immediately, so hooks left in hot paths
+cost a single attribute check.
+"""
+
+import threading
+import time
+from contextlib import nullcontext
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+BYTES_BUCKETS = (1e3, 1e4, 5e4, 1e5, 5e5, 1e6, 2e6, 5e6)
+
+_NULL_TIMER = nullcontext()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + (list(extra.items()) if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in items) + '}'
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+
+    def inc(self, labels, value):
+        self.values[labels] = self.values.get(labels, 0) + value
+
+    def render(self):
+        for labels, value in sorted(self.values.items()):
+            yield f"{self.name}{_format_labels(labels)} {_format_number(value)}"
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self.values = {}
+
+    def observe(self, labels, value):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        else:
+            series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def render(self):
+        for labels, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(labels, {'le': _format_number(bound)})} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_number(series[-1])}"
+            yield f"{self.name}_count{_format_labels(labels)} {cumulative}"
+
+
+class _Timer:
+    __slots__ = ('registry', 'name', 'labels', 'start')
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Metrics:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, help_text):
+        return self._metrics.setdefault(name, Counter(name, help_text))
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self._metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._metrics[name].inc(tuple(sorted(labels.items())), value)
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._metrics[name].observe(tuple(sorted(labels.items())), value)
+
+    def timer(self, name, **labels):
+        """Context manager observing the elapsed seconds into a histogram"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def render(self):
+        """All series in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for metric in self._metrics.values():
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+metrics.histogram('scraper_fetch_seconds', 'Latency of page fetches including retries')
+metrics.histogram('scraper_fetch_bytes', 'Size of fetched pages in bytes', BYTES_BUCKETS)
+metrics.counter('scraper_fetch_requests_total', 'HTTP requests sent, by response status')
+metrics.counter('scraper_fetch_retries_total', 'Fetch attempts that were retried')
+metrics.counter('scraper_fetch_hedges_total', 'Duplicate requests sent past the p95 latency, by which copy answered first')
+metrics.histogram('scraper_parse_seconds', 'Time spent parsing a results page')
+metrics.counter('scraper_parse_memo_total', 'Results pages served from (hit) or added to (miss) the parse memo')
+metrics.histogram('scraper_parse_products', 'Products extracted per results page', SIZE_BUCKETS)
+metrics.counter('scraper_selector_attempts_total', 'Field selector attempts that matched (hit) or not (miss)')
+metrics.histogram('scraper_stage_seconds', 'Time spent in post-processing stages (standardize, dedupe, filter, sort)')
+metrics.counter('scraper_scrapes_total', 'Per-source scrapes, by outcome (ok, empty, error, timeout, circuit_open)')
@@ -0,0 +1,220 @@
+"""Numeric parsing of scraped price, rating and count text.
+
+All patterns are compiled once at import and per-string results are cached,
+so repeated values across a result page cost a dict lookup. Parsers accept
+numbers unchanged and return ``None`` for text without a usable value; the
+``parse_*s`` batch functions turn a whole column into an ``array('d')``
+with NaN for the gaps.
+
+Grouping and decimal marks follow the locale when one is given (``'de'``:
+``1.099,00``; ``'en'``: ``1,099.00``) and are inferred otherwise: with both
+marks present the last one is the decimal mark, and a single mark followed
+by exactly three digits is taken as grouping.
+"""
+
+import re
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+
+NAN = float('nan')
+CACHE_SIZE = 8192
+
+# Decimal mark per UI locale; the other of "." / "," is grouping
+LOCALE_DECIMAL_MARKS = {
+    'en': '.',
+    'de': ',',
+    'fr': ',',
+    'es': ',',
+}
+
+CURRENCY_SYMBOLS = {
+    'US $': 'USD', 'US$': 'USD', 'CA$': 'CAD', 'C$': 'CAD', 'AU$': 'AUD', 'A$': 'AUD',
+    'HK$': 'HKD', 'R$': 'BRL', 'CHF': 'CHF', 'zł': 'PLN', '€': 'EUR', '£': 'GBP',
+    '¥': 'JPY', '₹': 'INR', '$': 'USD',
+}
+CURRENCY_CODES = ('USD', 'EUR', 'GBP', 'CAD', 'AUD', 'JPY', 'CNY', 'INR', 'CHF', 'MXN', 'BRL', 'PLN', 'SEK', 'HKD')
+DISPLAY_SYMBOLS = {'USD': '$', 'EUR': '€', 'GBP': '£', 'JPY': '¥', 'INR': '₹', 'CAD': 'C$', 'AUD': 'A$'}
+
+# "1 099,00" / "1'099.00" (space or apostrophe grouping), else digits joined by . or ,
+NUMBER_PATTERN = re.compile(r"\d{1,3}(?:[   ']\d{3})+(?:[.,]\d+)?|\d+(?:[.,]\d+)*")
+CURRENCY_PATTERN = re.compile(
+    '|'.join(re.escape(s) for s in sorted(CURRENCY_SYMBOLS, key=len, reverse=True))
+    + r'|\b(?:' + '|'.join(CURRENCY_CODES) + r')\b'
+)
+# A number followed by this is a unit price ("$0.43/oz", "0,50 € pro kg")
+PER_UNIT_PATTERN = re.compile(
+    r'\s*(?:' + CURRENCY_PATTERN.pattern + r')?\s*(?:/\s*[^\W\d]|(?:per|pro|par)\b)', re.IGNORECASE
+)
+# What may sit between the two ends of a range, currency symbols included
+RANGE_SEPARATOR_PATTERN = re.compile(r'\s*\D{0,4}?\s*(?:-|–|—|~|to|bis|à|a)\s*\D{0,4}$', re.IGNORECASE)
+COUNT_SUFFIX_PATTERN = re.compile(r'\s*([kKmM])\b')
+COUNT_MULTIPLIERS = {'k': 1_000, 'm': 1_000_000}
+GROUPING_CHARS = str.maketrans('', '', "   '")
+
+ParsedPrice = namedtuple('ParsedPrice', 'amount high currency')
+
+
+def _to_float(token, locale=None):
+    token = token.translate(GROUPING_CHARS)
+    dot, comma = token.rfind('.'), token.rfind(',')
+    if dot == -1 and comma == -1:
+        return float(token)
+    if dot != -1 and comma != -1:
+        decimal = '.' if dot > comma else ','
+    else:
+        mark = '.' if dot != -1 else ','
+        digits_after = len(token) - max(dot, comma) - 1
+        if token.count(mark) > 1:
+            decimal = None
+        elif digits_after != 3 or token.startswith('0' + mark):
+            decimal = mark
+        elif locale in LOCALE_DECIMAL_MARKS:
+            decimal = mark if LOCALE_DECIMAL_MARKS[locale] == mark else None
+        else:
+            # "1,099" / "1.099": three digits after a lone mark read as grouping
+            decimal = None
+    grouping = ',' if decimal == '.' else '.'
+    if decimal is None:
+        return float(token.replace('.', '').replace(',', ''))
+    return float(token.replace(grouping, '').replace(decimal, '.'))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_number_text(text, locale):
+    match = NUMBER_PATTERN.search(text)
+    return _to_float(match.group(0), locale) if match else None
+
+
+def parse_number(value, locale=None):
+    """First number in ``value`` as a float, or None"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _parse_number_text(str(value), locale)
+
+
+def detect_currency(text):
+    """ISO code of the first currency symbol or code in ``text``, or None"""
+    match = CURRENCY_PATTERN.search(str(text or ''))
+    if not match:
+        return None
+    token = match.group(0)
+    return CURRENCY_SYMBOLS.get(token, token)
+
+
+def _price_index(text, matches):
+    """Index of the number that is the price: the first one next to a
+    currency symbol or code that isn't a unit price, else the first one
+    ("2 for $10" is 10, "$0.43/oz $12.99" is 12.99)"""
+    currencies = list(CURRENCY_PATTERN.finditer(text))
+    if not currencies:
+        return 0
+    ends = {m.end() for m in currencies}
+    starts = {m.start() for m in currencies}
+    priced = []
+    for i, match in enumerate(matches):
+        before = len(text[:match.start()].rstrip())
+        after = len(text) - len(text[match.end():].lstrip())
+        if before in ends or after in starts:
+            priced.append(i)
+    for i in priced:
+        if not PER_UNIT_PATTERN.match(text, matches[i].end()):
+            return i
+    return priced[0] if priced else 0
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_price_text(text, locale):
+    matches = list(NUMBER_PATTERN.finditer(text))
+    if not matches:
+        return None
+    i = _price_index(text, matches)
+    amount = _to_float(matches[i].group(0), locale)
+    high = None
+    # A range's high end follows the price; a unit price after it is not one
+    if (i + 1 < len(matches)
+            and RANGE_SEPARATOR_PATTERN.match(text, matches[i].end(), matches[i + 1].start())
+            and not PER_UNIT_PATTERN.match(text, matches[i + 1].end())):
+        high = _to_float(matches[i + 1].group(0), locale)
+        if high < amount:
+            amount, high = high, amount
+    return ParsedPrice(amount, high, detect_currency(text))
+
+
+def parse_price(value, locale=None):
+    """``ParsedPrice(amount, high, currency)`` or None.
+
+    ``high`` is set for ranges ("US $1.50 - 3.20", "10,00 € – 12,00 €"),
+    where ``amount`` is the low end. Numbers next to a currency win over
+    bare ones ("2 for $10") and unit prices ("$0.43/oz") are never a range end.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return ParsedPrice(float(value), None, None)
+    return _parse_price_text(str(value), locale)
+
+
+def parse_rating(value, locale=None, scale=5.0):
+    """Star rating ("4.5 out of 5 stars", "4,5 von 5 Sternen") or None"""
+    rating = parse_number(value, locale)
+    if rating is None or rating > scale:
+        return None
+    return rating
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_count_text(text, locale):
+    match = NUMBER_PATTERN.search(text)
+    if not match:
+        return None
+    count = _to_float(match.group(0), locale)
+    suffix = COUNT_SUFFIX_PATTERN.match(text, match.end())
+    if suffix:
+        count *= COUNT_MULTIPLIERS[suffix.group(1).lower()]
+    return int(count)
+
+
+def parse_count(value, locale=None):
+    """Review/order count ("(12,345)", "2.3K") as an int, or None"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    return _parse_count_text(str(value), locale)
+
+
+def format_price(amount, currency=None, high=None):
+    """Display string for a parsed price, e.g. ``$1,099.00`` or ``$1.50 - $3.20``"""
+    symbol = DISPLAY_SYMBOLS.get(currency or 'USD', f"{currency} ")
+    text = f"{symbol}{amount or 0.0:,.2f}"
+    if high is not None:
+        text += f" - {symbol}{high:,.2f}"
+    return text
+
+
+def _column(values, parse, locale):
+    column = array('d')
+    append = column.append
+    for value in values:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            append(float(value))
+            continue
+        parsed = parse(value, locale)
+        append(NAN if parsed is None else float(parsed))
+    return column
+
+
+def parse_prices(values, locale=None):
+    """Batch ``parse_price``: the (low-end) amounts as an ``array('d')``"""
+    return _column(values, lambda v, loc: (parse_price(v, loc) or (None,))[0], locale)
+
+
+def parse_ratings(values, locale=None):
+    return _column(values, parse_rating, locale)
+
+
+def parse_counts(values, locale=None):
+    return _column(values, parse_count, locale)
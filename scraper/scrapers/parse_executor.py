@@ -0,0 +1,77 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .metrics import metrics
+from .selector_stats import SelectorStats
+
+# Pages smaller than this are cheaper to parse inline than to ship to a worker
+DEFAULT_INLINE_THRESHOLD = 64 * 1024
+
+
+def _parse_in_worker(scraper_cls, parser_backend, html, selectors, limit):
+    """Runs in a worker: only the HTML and selector config cross the boundary.
+
+    The selectors arrive already ordered by the parent's hit-rate table, and
+    the worker's hit/miss counters are returned so the parent can merge them.
+    """
+    stats = SelectorStats()
+    scraper = scraper_cls(parser_backend=parser_backend, selector_stats=stats)
+    products = scraper.creative_parse(html, selectors, limit=limit)
+    return products, stats.export()
+
+
+class ParseExecutor:
+    """Runs ``creative_parse`` off the event loop in a process or thread pool.
+
+    At most ``max_pending`` parses are queued or running at once; further
+    callers wait, which bounds the memory held by pages waiting to be parsed.
+    """
+
+    def __init__(self, kind='process', max_workers=None, max_pending=None,
+                 inline_threshold=DEFAULT_INLINE_THRESHOLD):
+        if kind not in ('process', 'thread'):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 2
+        self.inline_threshold = inline_threshold
+        if kind == 'process':
+            self._pool = ProcessPoolExecutor(
+                self.max_workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        else:
+            self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix='parse')
+        self._slots = asyncio.Semaphore(self.max_pending)
+
+    async def parse(self, scraper, html, selectors, limit):
+        if len(html) < self.inline_threshold:
+            return scraper.creative_parse(html, selectors, limit=limit)
+
+        stats = scraper.selector_stats
+        ordered = {
+            field: stats.order(scraper.site_name, field, candidates)
+            if field != 'product_selectors' else list(candidates)
+            for field, candidates in selectors.items()
+        }
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            products, counts = await loop.run_in_executor(
+                self._pool, _parse_in_worker,
+                type(scraper), scraper.parser.name, html, ordered, limit,
+            )
+        stats.merge(counts)
+        if metrics.enabled and self.kind == 'process':
+            # Worker processes can't see the registry; replay their counters
+            # (thread workers already counted into it)
+            for site, fields in counts.items():
+                for field, selectors in fields.items():
+                    hits = sum(c[0] for c in selectors.values())
+                    misses = sum(c[1] for c in selectors.values())
+                    metrics.inc('scraper_selector_attempts_total', hits, site=site, field=field, result='hit')
+                    metrics.inc('scraper_selector_attempts_total', misses, site=site, field=field, result='miss')
+        return products
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
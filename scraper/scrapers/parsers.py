@@ -0,0 +1,129 @@
+"""Pluggable HTML parser backends used by ``BaseScraper.creative_parse``.
+
+Each backend exposes the same small node API (``parse``, ``select``,
+``select_one``, ``text`` and ``attr``) so the extraction code does not care
+which tree it walks. The lxml backend is preferred; BeautifulSoup is kept as
+the fallback when lxml/cssselect are unavailable or cannot handle a page.
+"""
+
+import threading
+
+
+class ParserBackendError(Exception):
+    """Raised when a backend cannot parse a page or translate a selector"""
+
+
+class SoupBackend:
+    """Pure-Python BeautifulSoup backend (the historical behaviour)"""
+
+    name = 'soup'
+
+    def __init__(self):
+        import soupsieve
+        from bs4 import BeautifulSoup
+
+        self._beautiful_soup = BeautifulSoup
+        self._soupsieve = soupsieve
+        # selector -> compiled soupsieve matcher
+        self._compiled = {}
+
+    def compile(self, selector):
+        compiled = self._compiled.get(selector)
+        if compiled is None:
+            try:
+                compiled = self._soupsieve.compile(selector)
+            except Exception as e:
+                raise ParserBackendError(f"Cannot compile selector {selector!r}: {e}") from e
+            self._compiled[selector] = compiled
+        return compiled
+
+    def parse(self, html):
+        return self._beautiful_soup(html, 'html.parser')
+
+    def select(self, node, selector):
+        return self.compile(selector).select(node)
+
+    def select_one(self, node, selector):
+        return self.compile(selector).select_one(node)
+
+    def text(self, node):
+        return node.get_text()
+
+    def attr(self, node, name):
+        return node.get(name) if node.has_attr(name) else None
+
+
+class LxmlBackend:
+    """lxml's C parser with CSS selectors precompiled to XPath"""
+
+    name = 'lxml'
+
+    def __init__(self):
+        from cssselect import HTMLTranslator
+        from lxml import etree, html as lxml_html
+
+        self._etree = etree
+        self._translator = HTMLTranslator()
+        self._parser = lxml_html.HTMLParser(encoding='utf-8')
+        self._lxml_html = lxml_html
+        # selector -> (all matches XPath, first match XPath)
+        self._compiled = {}
+
+    def compile(self, selector):
+        compiled = self._compiled.get(selector)
+        if compiled is None:
+            try:
+                path = self._translator.css_to_xpath(selector, prefix='descendant::')
+                compiled = (self._etree.XPath(path), self._etree.XPath(f"({path})[1]"))
+            except Exception as e:
+                raise ParserBackendError(f"Cannot compile selector {selector!r}: {e}") from e
+            self._compiled[selector] = compiled
+        return compiled
+
+    def parse(self, html):
+        try:
+            return self._lxml_html.document_fromstring(html.encode('utf-8'), parser=self._parser)
+        except Exception as e:
+            raise ParserBackendError(f"lxml could not parse page: {e}") from e
+
+    def select(self, node, selector):
+        return self.compile(selector)[0](node)
+
+    def select_one(self, node, selector):
+        matches = self.compile(selector)[1](node)
+        return matches[0] if matches else None
+
+    def text(self, node):
+        return node.text_content()
+
+    def attr(self, node, name):
+        return node.get(name)
+
+
+# Compiled XPath objects are not shared between threads, so each thread
+# (e.g. a parse executor worker) keeps its own backend instances.
+_local = threading.local()
+
+
+def get_parser_backend(name='lxml'):
+    """Return a per-thread backend instance, falling back to BeautifulSoup"""
+    backends = getattr(_local, 'backends', None)
+    if backends is None:
+        backends = _local.backends = {}
+    backend = backends.get(name)
+    if backend is not None:
+        return backend
+
+    if name == 'lxml':
+        try:
+            backend = LxmlBackend()
+        except ImportError as e:
+            print(f"⚠️ lxml backend unavailable ({e}), falling back to BeautifulSoup")
+            backend = get_parser_backend('soup')
+    elif name == 'soup':
+        backend = SoupBackend()
+    else:
+        raise ValueError(f"Unknown parser backend: {name}")
+
+    backends[name] = backend
+    return backend
@@ -0,0 +1,171 @@
+import asyncio
+import random
+import time
+import urllib.parse
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+DEFAULT_RATE = 2.0          # requests per second per host
+DEFAULT_BURST = 5
+DEFAULT_INITIAL_CONCURRENCY = 4
+DEFAULT_MIN_CONCURRENCY = 1
+DEFAULT_MAX_CONCURRENCY = 16
+BASE_DELAY = 1.0
+MAX_DELAY = 60.0
+THROTTLE_STATUSES = (429, 503)
+RETRYABLE_STATUSES = (408, 500, 502, 504)
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a ``Retry-After`` header (delta or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt, retry_after=None, base=BASE_DELAY, cap=MAX_DELAY):
+    """Full-jitter exponential backoff, never shorter than ``retry_after``"""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = min(cap, retry_after) + random.uniform(0, base)
+    return delay
+
+
+class TokenBucket:
+    """Classic token bucket; ``pause`` blocks it until a point in time"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def pause(self, seconds):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AdaptiveConcurrency:
+    """AIMD in-flight limit: +1 per window of successes, halved on throttling"""
+
+    def __init__(self, initial=DEFAULT_INITIAL_CONCURRENCY, minimum=DEFAULT_MIN_CONCURRENCY,
+                 maximum=DEFAULT_MAX_CONCURRENCY):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def increase(self):
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def decrease(self):
+        self.limit = max(self.minimum, self.limit / 2)
+
+
+class HostLimiter:
+    def __init__(self, rate, burst, concurrency):
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+
+
+class RateLimiter:
+    """Per-host rate limiting shared by every scraper.
+
+    Each host gets a token bucket (steady request rate) and an AIMD
+    concurrency window. A throttling response pauses the host's bucket for
+    the ``Retry-After`` period, so every concurrent request to that host
+    waits instead of piling more 429s on top.
+    """
+
+    def __init__(self, default_rate=DEFAULT_RATE, default_burst=DEFAULT_BURST, host_rates=None,
+                 initial_concurrency=DEFAULT_INITIAL_CONCURRENCY,
+                 min_concurrency=DEFAULT_MIN_CONCURRENCY,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        # host -> (rate, burst)
+        self.host_rates = dict(host_rates or {})
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self._hosts = {}
+
+    def _host(self, url):
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        limiter = self._hosts.get(host)
+        if limiter is None:
+            rate, burst = self.host_rates.get(host, (self.default_rate, self.default_burst))
+            limiter = self._hosts[host] = HostLimiter(
+                rate, burst,
+                AdaptiveConcurrency(self.initial_concurrency, self.min_concurrency, self.max_concurrency),
+            )
+        return limiter
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """Wait for a token and a concurrency slot for the URL's host"""
+        host = self._host(url)
+        await host.concurrency.acquire()
+        try:
+            await host.bucket.acquire()
+            yield
+        finally:
+            await host.concurrency.release()
+
+    def on_success(self, url):
+        self._host(url).concurrency.increase()
+
+    def on_throttle(self, url, retry_after=None):
+        host = self._host(url)
+        host.concurrency.decrease()
+        if retry_after:
+            host.bucket.pause(min(retry_after, MAX_DELAY))
+
+    def stats(self):
+        return {
+            host: {
+                'concurrency_limit': round(limiter.concurrency.limit, 2),
+                'in_flight': limiter.concurrency.in_flight,
+                'tokens': round(limiter.bucket.tokens, 2),
+            }
+            for host, limiter in self._hosts.items()
+        }
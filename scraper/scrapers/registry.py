@@ -0,0 +1,70 @@
+"""Name -> module map of the site scrapers, imported on first use.
+
+Nothing here imports a scraper module (or its HTTP/parser dependencies)
+until a source is actually needed, so choosing one source costs one import.
+Stub sources are registered disabled and are skipped unless re-enabled.
+"""
+
+import importlib
+
+# name: (module relative to this package, class name, enabled)
+SCRAPER_PLUGINS = {
+    'amazon': ('.amazon_scraper', 'AmazonScraper', True),
+    'aliexpress': ('.aliexpress_scraper', 'AliExpressScraper', False),
+    'alibaba': ('.alibaba_scraper', 'AlibabaScraper', False),
+    'walmart': ('.walmart_scraper', 'WalmartScraper', False),
+}
+
+_loaded = {}
+
+
+class UnknownSourceError(ValueError):
+    """Raised for a source name that no scraper is registered under"""
+
+
+def register_scraper(name, module, class_name, enabled=True):
+    """Add or replace a source; ``module`` may be absolute or relative to ``scrapers``"""
+    SCRAPER_PLUGINS[name] = (module, class_name, enabled)
+    _loaded.pop(name, None)
+
+
+def set_enabled(name, enabled):
+    module, class_name, _ = _plugin(name)
+    SCRAPER_PLUGINS[name] = (module, class_name, enabled)
+
+
+def _plugin(name):
+    try:
+        return SCRAPER_PLUGINS[name]
+    except KeyError:
+        raise UnknownSourceError(f"Unknown source {name!r}; known: {', '.join(SCRAPER_PLUGINS)}") from None
+
+
+def available_sources():
+    return list(SCRAPER_PLUGINS)
+
+
+def enabled_sources():
+    return [name for name, (_, _, enabled) in SCRAPER_PLUGINS.items() if enabled]
+
+
+def resolve_sources(requested=None):
+    """Enabled sources among ``requested`` (all enabled ones when empty);
+    unknown names raise ``UnknownSourceError``, disabled ones are dropped"""
+    if not requested:
+        return enabled_sources()
+    names = []
+    for name in requested:
+        name = name.lower()
+        if _plugin(name)[2] and name not in names:
+            names.append(name)
+    return names
+
+
+def load_scraper_class(name):
+    """Import the source's module on first use and return its scraper class"""
+    cls = _loaded.get(name)
+    if cls is None:
+        module, class_name, _ = _plugin(name)
+        cls = _loaded[name] = getattr(importlib.import_module(module, __package__), class_name)
+    return cls
@@ -0,0 +1,186 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_TTL = 15 * 60
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Only headers that change the returned content take part in the cache key;
+# the rotating User-Agent would otherwise give every fetch its own entry.
+VARY_HEADERS = ('accept', 'accept-language')
+
+
+class CachedResponse:
+    """Body and validators of a cached page"""
+
+    def __init__(self, key, meta, body):
+        self.key = key
+        self.meta = meta
+        self.body = body
+
+    @property
+    def fresh(self):
+        return time.time() < self.meta['stored_at'] + self.meta['ttl']
+
+    def validators(self):
+        """Conditional request headers for revalidating a stale entry"""
+        headers = {}
+        if self.meta.get('etag'):
+            headers['If-None-Match'] = self.meta['etag']
+        if self.meta.get('last_modified'):
+            headers['If-Modified-Since'] = self.meta['last_modified']
+        return headers
+
+
+class ResponseCache:
+    """On-disk, size-bounded LRU cache of fetched pages.
+
+    Bodies are stored gzip-compressed next to a small JSON sidecar holding the
+    URL, TTL and ``ETag``/``Last-Modified`` validators. The body file's mtime
+    doubles as the last-access time used for eviction. With ``offline=True``
+    entries are served regardless of age and the network is never touched,
+    which makes scrapes replayable.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, default_ttl=DEFAULT_TTL,
+                 ttls=None, offline=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.offline = offline
+        self._lock = threading.Lock()
+        # key -> [size in bytes, last access time]
+        self._index = {}
+        self._total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def make_key(url, headers=None):
+        vary = sorted(
+            (name.lower(), ' '.join(str(value).split()))
+            for name, value in (headers or {}).items()
+            if name.lower() in VARY_HEADERS
+        )
+        raw = json.dumps([url, vary], separators=(',', ':'))
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def ttl_for(self, source):
+        return self.ttls.get(source, self.default_ttl)
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key[:2], key)
+        return base + '.gz', base + '.json'
+
+    def _scan(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.gz'):
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                self._index[name[:-3]] = [stat.st_size, stat.st_mtime]
+                self._total_bytes += stat.st_size
+
+    def _read(self, key):
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with gzip.open(body_path, 'rt', encoding='utf-8') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            self._discard(key)
+            return None
+        now = time.time()
+        with self._lock:
+            if key in self._index:
+                self._index[key][1] = now
+        try:
+            os.utime(body_path, (now, now))
+        except OSError:
+            pass
+        return CachedResponse(key, meta, body)
+
+    @staticmethod
+    def _atomic_write(path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _write(self, key, meta, body):
+        body_path, meta_path = self._paths(key)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        data = gzip.compress(body.encode('utf-8'), compresslevel=6)
+        self._atomic_write(body_path, data)
+        self._atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+        with self._lock:
+            previous = self._index.get(key)
+            if previous:
+                self._total_bytes -= previous[0]
+            self._index[key] = [len(data), time.time()]
+            self._total_bytes += len(data)
+        self._evict()
+
+    def _write_meta(self, key, meta):
+        _, meta_path = self._paths(key)
+        self._atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def _discard(self, key):
+        with self._lock:
+            entry = self._index.pop(key, None)
+            if entry:
+                self._total_bytes -= entry[0]
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return
+            victims = []
+            excess = self._total_bytes - self.max_bytes
+            for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+                if excess <= 0:
+                    break
+                victims.append(key)
+                excess -= size
+        for key in victims:
+            self._discard(key)
+
+    async def get(self, url, headers=None):
+        key = self.make_key(url, headers)
+        if key not in self._index:
+            return None
+        return await asyncio.to_thread(self._read, key)
+
+    async def put(self, url, headers, source, response):
+        key = self.make_key(url, headers)
+        meta = {
+            'url': url,
+            'source': source,
+            'stored_at': time.time(),
+            'ttl': self.ttl_for(source),
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+        }
+        await asyncio.to_thread(self._write, key, meta, response.text)
+
+    async def refresh(self, cached, response=None):
+        """Mark a revalidated (304) entry fresh again, keeping its body"""
+        cached.meta['stored_at'] = time.time()
+        if response is not None:
+            cached.meta['etag'] = response.headers.get('etag') or cached.meta.get('etag')
+            cached.meta['last_modified'] = response.headers.get('last-modified') or cached.meta.get('last_modified')
+        await asyncio.to_thread(self._write_meta, cached.key, cached.meta)
+
+    def stats(self):
+        return {'entries': len(self._index), 'bytes': self._total_bytes, 'max_bytes': self.max_bytes}
@@ -0,0 +1,137 @@
+"""Per-site selector config loaded from ``config/selector_config.json``.
+
+The file maps each site to its fields' fallback selectors::
+
+    {"amazon": {"product_selectors": [...], "title_selectors": [...], ...}}
+
+Every selector is compiled on load with both parser backends, so a typo is
+reported up front instead of as a silent miss while scraping. The registry
+re-checks the file's mtime every few seconds and swaps in the new config;
+an invalid edit is logged and the last good config keeps serving.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from .parsers import ParserBackendError, get_parser_backend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   'config', 'selector_config.json')
+# Seconds between mtime checks; get() never touches the disk more often
+DEFAULT_CHECK_INTERVAL = 2.0
+REQUIRED_FIELDS = ('product_selectors',)
+
+
+class SelectorConfigError(Exception):
+    """Raised when the selector config is missing, malformed or uncompilable"""
+
+
+def validate_config(config):
+    """Check the config's shape and compile every selector; returns it with
+    selector lists frozen to tuples"""
+    if not isinstance(config, dict) or not config:
+        raise SelectorConfigError("Selector config must be a non-empty object of sites")
+    backends = {get_parser_backend(name) for name in ('lxml', 'soup')}
+    validated = {}
+    for site, fields in config.items():
+        if not isinstance(fields, dict):
+            raise SelectorConfigError(f"{site}: expected an object of field selectors")
+        for field in REQUIRED_FIELDS:
+            if not fields.get(field):
+                raise SelectorConfigError(f"{site}: missing {field}")
+        site_fields = {}
+        for field, selectors in fields.items():
+            if not field.endswith('_selectors'):
+                raise SelectorConfigError(f"{site}.{field}: field names must end with '_selectors'")
+            if not isinstance(selectors, list) or not all(isinstance(s, str) and s.strip() for s in selectors):
+                raise SelectorConfigError(f"{site}.{field}: expected a list of selector strings")
+            for selector in selectors:
+                for backend in backends:
+                    try:
+                        backend.compile(selector)
+                    except ParserBackendError as e:
+                        raise SelectorConfigError(f"{site}.{field}: {e}") from e
+            site_fields[field] = tuple(selectors)
+        validated[site] = site_fields
+    return validated
+
+
+class SelectorRegistry:
+    """Validated, precompiled selectors per site with mtime-based hot reload"""
+
+    def __init__(self, path=DEFAULT_CONFIG_PATH, check_interval=DEFAULT_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._next_check = 0.0
+        self.reloads = 0
+        # An invalid config at start-up is an error; later edits only warn
+        self._sites = self._load()
+
+    def _load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path) as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            raise SelectorConfigError(f"Cannot read {self.path}: {e}") from e
+        sites = validate_config(config)
+        self._mtime = mtime
+        self._next_check = time.monotonic() + self.check_interval
+        return sites
+
+    def maybe_reload(self):
+        """Reload if the file changed; returns True when a new config is live"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        with self._lock:
+            if now < self._next_check:
+                return False
+            self._next_check = now + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError as e:
+                logger.warning("⚠️ Keeping previous selector config: %s", e)
+                return False
+            if mtime == self._mtime:
+                return False
+            try:
+                self._sites = self._load()
+            except SelectorConfigError as e:
+                logger.warning("⚠️ Keeping previous selector config: %s", e)
+                # Don't re-read (and re-warn about) the same broken edit
+                self._mtime = mtime
+                return False
+        self.reloads += 1
+        logger.info("🔁 Reloaded selector config from %s", self.path)
+        return True
+
+    def get(self, site):
+        """The site's ``{field: (selector, ...)}`` config (treat as read-only)"""
+        self.maybe_reload()
+        try:
+            return self._sites[site]
+        except KeyError:
+            raise SelectorConfigError(f"No selectors configured for {site!r}") from None
+
+    def sites(self):
+        self.maybe_reload()
+        return list(self._sites)
+
+
+_default_registry = None
+
+
+def default_registry():
+    """Process-wide registry for ``DEFAULT_CONFIG_PATH``, created on first use"""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = SelectorRegistry()
+    return _default_registry
@@ -0,0 +1,164 @@
+import json
+import os
+import tempfile
+from collections import OrderedDict
+
+DEFAULT_MAX_SITES = 16
+DEFAULT_MAX_FIELDS = 32
+DEFAULT_MAX_SELECTORS = 16
+# Once a field has seen this many attempts its counters are halved, so a
+# selector that stops matching after a layout change loses its lead quickly.
+DEFAULT_DECAY_WINDOW = 500
+# How many recordings a field takes before its cached ordering is rebuilt
+REORDER_INTERVAL = 16
+# A selector that has missed this often without a single hit (within the
+# decay window), while the field's other selectors found the value at least
+# as often, is tried after the others
+DEAD_AFTER_MISSES = 20
+# Every this many order rebuilds a field is tried in configured order once,
+# so a demoted selector that matches again gets its place back
+REPROBE_EVERY = 8
+
+
+class SelectorStats:
+    """Per-site selector hit-rate table used to skip selectors that keep missing.
+
+    Fallbacks are only tried after the selectors before them missed, so
+    their hit rates are conditional and can't be ranked against the
+    primary's. Reordering therefore keeps the configured priority and only
+    moves selectors that have recently never matched to the end, which
+    leaves the extracted values unchanged. A field missing from most items
+    (sparse prices or ratings) makes every selector miss, so demotion also
+    needs the other selectors to have found the value, and demoted ones are
+    periodically tried in their configured place again.
+
+    Layout: ``{site: {field: {selector: [hits, misses]}}}``. The table is
+    bounded (sites are evicted LRU, fields and selectors by least use) and
+    can be saved to / loaded from a JSON file.
+    """
+
+    def __init__(self, max_sites=DEFAULT_MAX_SITES, max_fields=DEFAULT_MAX_FIELDS,
+                 max_selectors=DEFAULT_MAX_SELECTORS, decay_window=DEFAULT_DECAY_WINDOW):
+        self.max_sites = max_sites
+        self.max_fields = max_fields
+        self.max_selectors = max_selectors
+        self.decay_window = decay_window
+        self._sites = OrderedDict()
+        # (site, field) -> [selectors tuple, ordered list, recordings since build, builds]
+        self._orders = {}
+
+    @staticmethod
+    def _score(counts):
+        # Laplace-smoothed hit rate: untried selectors sit at 0.5, so a
+        # selector that keeps missing drops below ones never attempted.
+        hits, misses = counts
+        return (hits + 1) / (hits + misses + 2)
+
+    def _field_table(self, site, field):
+        fields = self._sites.get(site)
+        if fields is None:
+            fields = self._sites[site] = {}
+            if len(self._sites) > self.max_sites:
+                evicted, _ = self._sites.popitem(last=False)
+                self._orders = {k: v for k, v in self._orders.items() if k[0] != evicted}
+        else:
+            self._sites.move_to_end(site)
+
+        table = fields.get(field)
+        if table is None:
+            if len(fields) >= self.max_fields:
+                coldest = min(fields, key=lambda f: sum(sum(c) for c in fields[f].values()))
+                del fields[coldest]
+                self._orders.pop((site, coldest), None)
+            table = fields[field] = {}
+        return table
+
+    @staticmethod
+    def _dead(counts, others_hits):
+        hits, misses = counts
+        return hits == 0 and misses >= DEAD_AFTER_MISSES and others_hits >= DEAD_AFTER_MISSES
+
+    def order(self, site, field, selectors):
+        """Return ``selectors`` in configured order, known misses moved last"""
+        key = (site, field)
+        cached = self._orders.get(key)
+        selectors = tuple(selectors)
+        if cached is not None and cached[0] == selectors and cached[2] < REORDER_INTERVAL:
+            return cached[1]
+
+        builds = cached[3] + 1 if cached is not None else 0
+        if builds % REPROBE_EVERY == REPROBE_EVERY - 1:
+            ordered = list(selectors)
+        else:
+            table = self._sites.get(site, {}).get(field, {})
+            total_hits = sum(table[selector][0] for selector in selectors if selector in table)
+            ordered = sorted(selectors, key=lambda selector: self._dead(table.get(selector, (0, 0)), total_hits))
+        self._orders[key] = [selectors, ordered, 0, builds]
+        return ordered
+
+    def record(self, site, field, selector, hit):
+        table = self._field_table(site, field)
+        counts = table.get(selector)
+        if counts is None:
+            if len(table) >= self.max_selectors:
+                del table[min(table, key=lambda s: sum(table[s]))]
+            counts = table[selector] = [0, 0]
+        counts[0 if hit else 1] += 1
+
+        if sum(sum(c) for c in table.values()) > self.decay_window:
+            for c in table.values():
+                c[0] //= 2
+                c[1] //= 2
+
+        cached = self._orders.get((site, field))
+        if cached is not None:
+            cached[2] += 1
+
+    def merge(self, snapshot):
+        """Fold raw counters (as produced by ``export``) into this table"""
+        for site, fields in snapshot.items():
+            for field, selectors in fields.items():
+                table = self._field_table(site, field)
+                for selector, (hits, misses) in selectors.items():
+                    counts = table.setdefault(selector, [0, 0])
+                    counts[0] += hits
+                    counts[1] += misses
+                self._orders.pop((site, field), None)
+
+    def export(self):
+        return {
+            site: {field: {s: list(c) for s, c in table.items()} for field, table in fields.items()}
+            for site, fields in self._sites.items()
+        }
+
+    def snapshot(self):
+        """Hit-rate view of the table, meant for inspection"""
+        return {
+            site: {
+                field: [
+                    {'selector': s, 'hits': c[0], 'misses': c[1], 'hit_rate': round(c[0] / max(c[0] + c[1], 1), 3)}
+                    for s, c in sorted(table.items(), key=lambda item: -self._score(item[1]))
+                ]
+                for field, table in fields.items()
+            }
+            for site, fields in self._sites.items()
+        }
+
+    def save(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.export(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        stats = cls(**kwargs)
+        try:
+            with open(path) as f:
+                stats.merge(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError) as e:
+            print(f"⚠️ Ignoring unreadable selector stats {path}: {e}")
+        return stats
@@ -0,0 +1,111 @@
+"""Incremental product extraction from a page that is still downloading.
+
+``IncrementalProductParser`` is fed raw response bytes and hands back each
+product as soon as its container element closes. Everything outside the
+current container is discarded as it completes, so memory stays bounded by
+roughly one product's subtree instead of the whole document.
+
+Only product selectors without combinators (``div[data-x="y"]``,
+``.item.card``) can be matched against an element while the tree is still
+being built; ``supports_streaming`` tells callers when to fall back to the
+buffered ``creative_parse``.
+"""
+
+from .parsers import ParserBackendError, get_parser_backend
+
+# Stop reading (and keep what was extracted so far) past this many bytes
+DEFAULT_MAX_PAGE_BYTES = 4 * 1024 * 1024
+
+
+def _streaming_matcher(selector):
+    """XPath testing a single element against ``selector``, or None when the
+    selector needs ancestors/siblings (combinators) to be evaluated"""
+    try:
+        from cssselect import HTMLTranslator, parse
+        from cssselect.parser import CombinedSelector
+        from lxml import etree
+    except ImportError:
+        return None
+    try:
+        parsed = parse(selector)
+        if len(parsed) != 1 or isinstance(parsed[0].parsed_tree, CombinedSelector) or parsed[0].pseudo_element:
+            return None
+        return etree.XPath(HTMLTranslator().css_to_xpath(selector, prefix='self::'))
+    except Exception:
+        return None
+
+
+def supports_streaming(parser, selectors):
+    """True when the backend is lxml and a product selector can be streamed"""
+    return parser.name == 'lxml' and any(
+        _streaming_matcher(selector) is not None for selector in selectors.get('product_selectors', [])
+    )
+
+
+class IncrementalProductParser:
+    """Feed bytes with ``feed``; it returns the products completed so far.
+
+    ``extract`` is called with each closed container element and the lxml
+    backend (normally ``BaseScraper._extract_product_data``). Matching uses
+    the first streamable product selector only; callers parse the page whole
+    when it yields nothing (see ``BaseScraper._stream_page``).
+    """
+
+    def __init__(self, selectors, extract, limit=None, encoding='utf-8'):
+        from lxml import etree, html as lxml_html
+
+        self.matcher = next(
+            (m for m in map(_streaming_matcher, selectors.get('product_selectors', [])) if m is not None), None
+        )
+        if self.matcher is None:
+            raise ParserBackendError("No product selector can be matched incrementally")
+        self.backend = get_parser_backend('lxml')
+        self.extract = extract
+        self.limit = limit
+        self.found = 0
+        self._parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+        # HtmlElement nodes, so the backend's text_content()/get() work as usual
+        self._parser.set_element_class_lookup(lxml_html.HtmlElementClassLookup())
+        self._container = None
+
+    @property
+    def done(self):
+        return self.limit is not None and self.found >= self.limit
+
+    def feed(self, data):
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self):
+        try:
+            self._parser.close()
+        except Exception:
+            # A truncated page (byte budget, early stop) may not close cleanly
+            pass
+        return self._drain()
+
+    def _drain(self):
+        products = []
+        for event, element in self._parser.read_events():
+            if self.done:
+                break
+            if event == 'start':
+                if self._container is None and self.matcher(element):
+                    self._container = element
+                continue
+            if element is self._container:
+                self._container = None
+                product = self.extract(element, self.backend)
+                if product:
+                    products.append(product)
+                    self.found += 1
+            elif self._container is not None:
+                # Still building the current product; keep its subtree
+                continue
+            # Completed and no longer needed: free it and its finished siblings
+            element.clear()
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+        return products
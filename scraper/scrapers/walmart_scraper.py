@@ -2,6 +2,8 @@ from . import BaseScraper
 import urllib.parse
 
 class WalmartScraper(BaseScraper):
+    site_name = 'walmart'
+
     async def scrape(self, params):
         print("⚠️ Walmart scraper not yet implemented")
         return {'source': 'walmart', 'products': []}
\ No newline at end of file
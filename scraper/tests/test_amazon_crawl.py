@@ -0,0 +1,54 @@
+import asyncio
+import unittest
+
+from scrapers.amazon_scraper import AmazonScraper
+from scrapers.selector_stats import SelectorStats
+
+PAGES = {
+    1: [
+        {'title': 'Kettle', 'price': '$20.00', 'link': 'https://www.amazon.com/dp/B000000001?ref=sr_1'},
+        {'price': '$5.00'},
+        {'price': '$6.00'},
+    ],
+    2: [
+        {'title': 'Kettle', 'price': '$20.00', 'link': 'https://www.amazon.com/dp/B000000001?ref=sr_2'},
+        {'price': '$7.00'},
+    ],
+}
+
+
+class StubAmazonScraper(AmazonScraper):
+    async def page_products(self, url, selectors, limit=None):
+        page = int(url.rsplit('page=', 1)[1]) if 'page=' in url else 1
+        return [dict(product) for product in PAGES.get(page, [])]
+
+
+class SlowAmazonScraper(AmazonScraper):
+    async def page_products(self, url, selectors, limit=None):
+        await asyncio.sleep(10)
+        return []
+
+
+class AmazonCrawlTest(unittest.TestCase):
+    def test_products_without_link_or_title_are_kept(self):
+        scraper = StubAmazonScraper(selector_stats=SelectorStats())
+        result = asyncio.run(scraper.crawl({'search_input': 'kettle', 'category': 'all', 'max_price': 100, 'max_pages': 3}))
+        self.assertEqual([p['price'] for p in result['products']], ['$20.00', '$5.00', '$6.00', '$7.00'])
+
+    def test_cancelling_the_crawl_propagates(self):
+        scraper = SlowAmazonScraper(selector_stats=SelectorStats())
+
+        async def cancel_crawl():
+            task = asyncio.ensure_future(
+                scraper.crawl({'search_input': 'kettle', 'category': 'all', 'max_price': 100, 'max_pages': 5})
+            )
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(asyncio.wait_for(cancel_crawl(), timeout=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
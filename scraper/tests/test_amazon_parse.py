@@ -0,0 +1,42 @@
+import contextlib
+import glob
+import io
+import os
+import unittest
+
+from scrapers.amazon_scraper import AmazonScraper
+
+# Saved search-result pages, shared with benchmarks/bench.py
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'fixtures', 'amazon_*.html')))
+
+
+def parse(path, backend):
+    scraper = AmazonScraper(parser_backend=backend)
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    with contextlib.redirect_stdout(io.StringIO()):
+        return scraper.creative_parse(html, scraper.get_selectors(), limit=None)
+
+
+class AmazonFixtureParseTest(unittest.TestCase):
+    def test_fixtures_exist(self):
+        self.assertTrue(FIXTURES)
+
+    def test_every_result_has_title_price_and_link(self):
+        for path in FIXTURES:
+            with self.subTest(fixture=os.path.basename(path)):
+                products = parse(path, 'lxml')
+                self.assertTrue(products)
+                for product in products:
+                    self.assertTrue(product['title'])
+                    self.assertIsInstance(product['price'], float)
+                    self.assertTrue(product['link'].startswith('https://www.amazon.com/dp/'))
+
+    def test_backends_agree(self):
+        for path in FIXTURES:
+            with self.subTest(fixture=os.path.basename(path)):
+                self.assertEqual(parse(path, 'lxml'), parse(path, 'soup'))
+
+
+if __name__ == '__main__':
+    unittest.main()
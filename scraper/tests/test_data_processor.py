@@ -0,0 +1,24 @@
+import unittest
+
+from data_processor import DataProcessor, Product
+from exporter import ui_record
+
+
+class ProductTest(unittest.TestCase):
+    def test_category_reaches_the_ui_record(self):
+        product = DataProcessor().standardize_data(
+            [{'title': 'Kettle', 'price': '$20.00', 'category': 'Home & Kitchen'}], 'amazon'
+        )[0]
+        self.assertEqual(product.to_dict()['category'], 'Home & Kitchen')
+        self.assertEqual(ui_record(product.to_dict())['category'], 'Home & Kitchen')
+
+    def test_products_compare_like_dicts_and_are_unhashable(self):
+        product = Product(title='Kettle', price='$20.00')
+        self.assertEqual(product, Product(title='Kettle', price='$20.00'))
+        self.assertEqual(product, product.to_dict())
+        with self.assertRaises(TypeError):
+            hash(product)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from data_processor import DataProcessor, Product, ProductTable
+from dedup import dedupe_offers
+
+
+def product(title, price, source, url):
+    return Product(title=title, price=price, source=source, url=url)
+
+
+class DedupeOffersTest(unittest.TestCase):
+    def test_variants_from_the_same_source_are_kept(self):
+        table = ProductTable([
+            product('Apple AirPods Pro 2nd Generation Wireless Earbuds Black', '$199.00', 'Amazon',
+                    'https://www.amazon.com/dp/B0000000A1'),
+            product('Apple AirPods Pro 2nd Generation Wireless Earbuds White', '$189.00', 'Amazon',
+                    'https://www.amazon.com/dp/B0000000A2'),
+        ])
+        self.assertEqual(len(dedupe_offers(table)), 2)
+
+    def test_same_product_from_different_sources_is_merged(self):
+        table = ProductTable([
+            product('Apple AirPods Pro 2nd Generation Wireless Earbuds', '$199.00', 'Amazon',
+                    'https://www.amazon.com/dp/B0000000A1'),
+            product('Apple AirPods Pro 2nd Generation Wireless Earbuds', '$189.00', 'Walmart',
+                    'https://www.walmart.com/ip/1'),
+            product('Apple AirPods Pro 2nd Generation Wireless Earbuds White', '$179.00', 'Amazon',
+                    'https://www.amazon.com/dp/B0000000A2'),
+        ])
+        deduped = dedupe_offers(table)
+        self.assertEqual(len(deduped), 2)
+        merged = next(row for row in deduped.rows if row.offers)
+        self.assertEqual(sorted(offer['source'] for offer in merged.offers), ['Amazon', 'Walmart'])
+        self.assertEqual(merged.source, 'Walmart')
+
+    def test_generic_sources_are_told_apart(self):
+        products = [{'title': 'Sony WH-1000XM5 Wireless Noise Canceling Headphones', 'price': '$329.00'}]
+        processor = DataProcessor()
+        table = processor.standardize_table(products, 'walmart')
+        table.extend(processor.standardize_table(products, 'aliexpress'))
+        deduped = dedupe_offers(table)
+        self.assertEqual(len(deduped), 1)
+        self.assertEqual(sorted(offer['source'] for offer in deduped.rows[0].offers), ['AliExpress', 'Walmart'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from exporter import export_catalog
+
+
+class ExportCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.shard_dir = os.path.join(self.tmp.name, 'products')
+        self.manifest_path = os.path.join(self.tmp.name, 'manifest.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def export(self):
+        return export_catalog([{'title': 'Kettle', 'price': '$20.00', 'source': 'Amazon'}],
+                              self.shard_dir, self.manifest_path, keep_builds=2)
+
+    def builds(self):
+        return sorted(os.listdir(self.shard_dir), key=int)
+
+    def test_indexes_order_ids_by_value(self):
+        products = [
+            {'title': 'A', 'price': '$30.00', 'rating': '4.0', 'reviews': '10', 'source': 'Amazon'},
+            {'title': 'B', 'price': '$10.00', 'rating': '4.5', 'reviews': '5', 'source': 'Walmart'},
+            {'title': 'C', 'price': None, 'rating': '3.0', 'reviews': '50', 'source': 'Amazon'},
+        ]
+        manifest = export_catalog(products, self.shard_dir, self.manifest_path, url_prefix='')
+        indexes = {}
+        for name in ('price', 'rating', 'reviews'):
+            with open(os.path.join(self.shard_dir, manifest['build'], 'index', f'{name}.json')) as f:
+                indexes[name] = json.load(f)
+        self.assertEqual(indexes['price'], {'ids': [1, 0, 2], 'values': [10.0, 30.0, None]})
+        self.assertEqual(indexes['rating']['ids'], [1, 0, 2])
+        self.assertEqual(indexes['reviews']['ids'], [2, 0, 1])
+        self.assertEqual(set(manifest['indexes']), {'price', 'rating', 'reviews', 'source'})
+
+    def test_keeps_the_newest_builds(self):
+        for _ in range(3):
+            manifest = self.export()
+        self.assertEqual(len(self.builds()), 2)
+        self.assertEqual(self.builds()[-1], manifest['build'])
+        with open(self.manifest_path) as f:
+            self.assertEqual(json.load(f)['build'], manifest['build'])
+
+    def test_never_prunes_a_newer_build(self):
+        newer = str(time.time_ns() + 10 ** 12)
+        os.makedirs(os.path.join(self.shard_dir, newer, 'pages'))
+        for _ in range(3):
+            manifest = self.export()
+        self.assertIn(newer, self.builds())
+        self.assertIn(manifest['build'], self.builds())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from data_processor import DataProcessor
+from scrapers.fingerprint import DeltaTracker
+
+
+def scraped(in_stock):
+    return [{
+        'title': 'Wireless Headphones',
+        'price': 59.99,
+        'rating': 4.5,
+        'link': 'https://www.amazon.com/dp/B000000001',
+        'in_stock': in_stock,
+    }]
+
+
+class DeltaTrackerTest(unittest.TestCase):
+    def test_stock_change_of_standardized_products_is_reported(self):
+        processor = DataProcessor()
+        tracker = DeltaTracker()
+        tracker.update('query', processor.standardize_table(scraped(True), 'amazon').rows)
+        delta = tracker.update('query', processor.standardize_table(scraped(False), 'amazon').rows)
+
+        self.assertEqual(len(delta['changed']), 1)
+        self.assertIs(delta['changed'][0]['previous_in_stock'], True)
+        self.assertIs(delta['changed'][0]['product']['in_stock'], False)
+        self.assertEqual(delta['unchanged'], 0)
+
+    def test_unchanged_products_are_counted(self):
+        processor = DataProcessor()
+        tracker = DeltaTracker()
+        tracker.update('query', processor.standardize_table(scraped(True), 'amazon').rows)
+        delta = tracker.update('query', processor.standardize_table(scraped(True), 'amazon').rows)
+        self.assertEqual((delta['changed'], delta['unchanged']), ([], 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
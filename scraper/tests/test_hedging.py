@@ -0,0 +1,46 @@
+import asyncio
+import unittest
+
+from scrapers.hedging import Hedger
+
+
+def hedger(**kwargs):
+    h = Hedger(min_samples=5, min_delay=0.01, **kwargs)
+    for _ in range(5):
+        h.record('site', 0.02)
+    return h
+
+
+class HedgerTest(unittest.TestCase):
+    def test_cancelled_primary_is_sampled_as_a_lower_bound(self):
+        h = hedger(max_hedge_ratio=1.0)
+        calls = []
+
+        async def request():
+            calls.append('primary')
+            await asyncio.sleep(1)
+            return 'primary'
+
+        async def hedge_request():
+            calls.append('hedge')
+            return 'hedge'
+
+        self.assertEqual(asyncio.run(h.run('site', request, hedge_request)), 'hedge')
+        self.assertEqual(calls, ['primary', 'hedge'])
+        # The primary's time so far, not the hedge's near-zero latency
+        self.assertGreaterEqual(h._latencies['site'][-1], 0.02)
+        self.assertEqual(len(h._latencies['site']), 6)
+
+    def test_hedges_are_capped(self):
+        h = hedger(max_hedge_ratio=0.0)
+
+        async def request():
+            await asyncio.sleep(0.05)
+            return 'primary'
+
+        self.assertEqual(asyncio.run(h.run('site', request)), 'primary')
+        self.assertEqual((h.requests, h.hedged), (1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
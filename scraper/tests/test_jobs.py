@@ -0,0 +1,35 @@
+import time
+import unittest
+
+from jobs import Scheduler
+
+HOUR = 60 * 60
+
+
+class RecordingQueue:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, params, priority, origin):
+        self.submitted.append(params['search_input'])
+
+
+class SchedulerTest(unittest.TestCase):
+    def test_restart_skips_recent_queries_and_staggers_the_rest(self):
+        watchlist = [({'search_input': q}, HOUR) for q in ('kettle', 'toaster', 'blender')]
+        recent = {'kettle': time.time() - 60}
+        queue = RecordingQueue()
+        scheduler = Scheduler(queue, watchlist, last_scraped=lambda p: recent.get(p['search_input']), stagger=10)
+
+        scheduler.run_due(now=0)
+        self.assertEqual(queue.submitted, ['toaster'])
+        scheduler.run_due(now=10)
+        self.assertEqual(queue.submitted, ['toaster', 'blender'])
+        scheduler.run_due(now=HOUR - 120)
+        self.assertEqual(queue.submitted, ['toaster', 'blender'])
+        scheduler.run_due(now=HOUR - 55)
+        self.assertEqual(queue.submitted, ['toaster', 'blender', 'kettle'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+
+from scrapers.normalize import ParsedPrice, parse_price
+
+
+class ParsePriceTest(unittest.TestCase):
+    def test_ranges(self):
+        self.assertEqual(parse_price('US $1.50 - 3.20'), ParsedPrice(1.5, 3.2, 'USD'))
+        self.assertEqual(parse_price('10,00 € – 12,00 €'), ParsedPrice(10.0, 12.0, 'EUR'))
+        self.assertEqual(parse_price('$10-$20'), ParsedPrice(10.0, 20.0, 'USD'))
+        self.assertEqual(parse_price('$5 to $7'), ParsedPrice(5.0, 7.0, 'USD'))
+
+    def test_unit_price_is_not_a_range_end(self):
+        self.assertEqual(parse_price('$12.99 - $0.43/oz'), ParsedPrice(12.99, None, 'USD'))
+        self.assertEqual(parse_price('$19.99 ($0.50/count)'), ParsedPrice(19.99, None, 'USD'))
+        self.assertEqual(parse_price('2,99 € - 0,50 € pro kg'), ParsedPrice(2.99, None, 'EUR'))
+
+    def test_number_next_to_the_currency_is_the_price(self):
+        self.assertEqual(parse_price('2 for $10').amount, 10.0)
+        self.assertEqual(parse_price('$0.43/oz $12.99').amount, 12.99)
+        self.assertEqual(parse_price('Save 15% EUR 49,90').amount, 49.9)
+
+    def test_plain_numbers(self):
+        self.assertEqual(parse_price('1,099.00'), ParsedPrice(1099.0, None, None))
+        self.assertEqual(parse_price(12), ParsedPrice(12.0, None, None))
+        self.assertIsNone(parse_price('Currently unavailable'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import asyncio
+import unittest
+
+from scrapers import BaseScraper
+from scrapers.metrics import metrics
+from scrapers.parse_executor import ParseExecutor
+from scrapers.selector_stats import SelectorStats
+
+SELECTORS = {
+    'product_selectors': ['div.item'],
+    'title_selectors': ['h2'],
+}
+PAGE = '<html><body>' + ''.join(f'<div class="item"><h2>Item {i}</h2></div>' for i in range(5)) + '</body></html>'
+
+
+def title_attempts():
+    counter = metrics._metrics['scraper_selector_attempts_total']
+    return sum(value for labels, value in counter.values.items()
+               if dict(labels).get('field') == 'title_selectors')
+
+
+class ParseExecutorMetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.was_enabled = metrics.enabled
+        metrics.enabled = True
+
+    def tearDown(self):
+        metrics.enabled = self.was_enabled
+
+    def test_thread_workers_are_counted_once(self):
+        executor = ParseExecutor(kind='thread', max_workers=1, inline_threshold=0)
+        scraper = BaseScraper(selector_stats=SelectorStats())
+        before = title_attempts()
+        try:
+            products = asyncio.run(executor.parse(scraper, PAGE, SELECTORS, limit=None))
+        finally:
+            executor.shutdown()
+        self.assertEqual(len(products), 5)
+        self.assertEqual(title_attempts() - before, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from product_store import ProductStore
+
+KETTLE = {'title': 'Kettle', 'price': '$20.00', 'source': 'Amazon', 'link': 'https://www.amazon.com/dp/B000000001'}
+TOASTER = {'title': 'Toaster', 'price': '$35.00', 'source': 'Amazon', 'link': 'https://www.amazon.com/dp/B000000002'}
+
+
+class ProductStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = ProductStore(':memory:')
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_repeated_searches_list_each_product_once(self):
+        params = {'search_input': 'kitchen'}
+        self.store.add_products([KETTLE, TOASTER], 'amazon', params, scraped_at=1.0)
+        self.store.add_products([{**KETTLE, 'price': '$18.00'}, TOASTER], 'amazon', params, scraped_at=2.0)
+
+        page = self.store.query(query='kitchen', sort_by='price_low_to_high')
+        self.assertEqual(page['total'], 2)
+        self.assertEqual([(item['title'], item['price']) for item in page['items']],
+                         [('Kettle', '$18.00'), ('Toaster', '$35.00')])
+
+    def test_filters_apply_to_the_latest_sighting(self):
+        self.store.add_products([KETTLE], 'amazon', scraped_at=1.0)
+        self.store.add_products([{**KETTLE, 'price': '$40.00'}], 'amazon', scraped_at=2.0)
+        self.assertEqual(self.store.query(max_price=30)['total'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
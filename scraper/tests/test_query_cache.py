@@ -0,0 +1,33 @@
+import asyncio
+import unittest
+
+from query_cache import QueryCache, normalize_query
+
+PARAMS = {'search_input': 'kettle', 'max_price': 50, 'sources': ['amazon', 'walmart']}
+
+
+class QueryCacheTest(unittest.TestCase):
+    def test_deadline_is_part_of_the_key(self):
+        self.assertNotEqual(normalize_query({**PARAMS, 'deadline': 1.0}), normalize_query(PARAMS))
+
+    def test_partial_results_are_not_kept(self):
+        cache = QueryCache()
+        results = iter([
+            {'products': [{'title': 'Kettle'}], 'partial': ['walmart']},
+            {'products': [{'title': 'Kettle'}, {'title': 'Kettle 2'}], 'partial': []},
+        ])
+
+        async def compute():
+            return next(results)
+
+        async def search():
+            key = normalize_query(PARAMS)
+            return [await cache.get_or_compute(key, compute) for _ in range(3)]
+
+        first, second, third = asyncio.run(search())
+        self.assertEqual((first[1], second[1], third[1]), ('miss', 'miss', 'hit'))
+        self.assertEqual(third[0]['partial'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from scrapers import BaseScraper
+from scrapers.selector_stats import REORDER_INTERVAL, REPROBE_EVERY, SelectorStats
+
+SELECTORS = {
+    'product_selectors': ['div.item'],
+    'description_selectors': ['.a-size-base-plus', '.a-size-base'],
+}
+
+
+def results_page(count):
+    """Every third item lacks the primary description"""
+    items = []
+    for i in range(count):
+        primary = f'<span class="a-size-base-plus">Desc {i}</span>' if i % 3 else ''
+        items.append(f'<div class="item">{primary}<span class="a-size-base">Sponsored {i}</span></div>')
+    return '<html><body>' + ''.join(items) + '</body></html>'
+
+
+def descriptions(scraper, html):
+    parser = scraper.parser
+    root = parser.parse(html)
+    return [
+        parser.text(scraper._select_first(parser, item, SELECTORS, 'description_selectors'))
+        for item in parser.select(root, 'div.item')
+    ]
+
+
+class SelectorOrderTest(unittest.TestCase):
+    def test_extraction_does_not_depend_on_history(self):
+        html = results_page(30)
+        fresh = descriptions(BaseScraper(selector_stats=SelectorStats()), html)
+
+        seasoned = BaseScraper(selector_stats=SelectorStats())
+        for _ in range(20):
+            descriptions(seasoned, html)
+        self.assertEqual(descriptions(seasoned, html), fresh)
+        self.assertEqual(fresh[1], 'Desc 1')
+        self.assertEqual(fresh[0], 'Sponsored 0')
+
+    def test_selector_that_never_matches_is_tried_last(self):
+        stats = SelectorStats()
+        for _ in range(25):
+            stats.record('site', 'title_selectors', '.gone', False)
+            stats.record('site', 'title_selectors', '.title', True)
+        self.assertEqual(stats.order('site', 'title_selectors', ['.gone', '.title', '.other']),
+                         ['.title', '.other', '.gone'])
+
+    def test_sparse_field_is_not_demoted(self):
+        stats = SelectorStats()
+        for _ in range(25):
+            # Items without a rating: every selector misses
+            stats.record('site', 'rating_selectors', '.rating', False)
+            stats.record('site', 'rating_selectors', '.stars', False)
+        self.assertEqual(stats.order('site', 'rating_selectors', ['.rating', '.stars']), ['.rating', '.stars'])
+
+    def test_demoted_selector_is_reprobed(self):
+        stats = SelectorStats()
+        for _ in range(25):
+            stats.record('site', 'title_selectors', '.gone', False)
+            stats.record('site', 'title_selectors', '.title', True)
+        orders = []
+        for _ in range(REPROBE_EVERY):
+            orders.append(stats.order('site', 'title_selectors', ['.gone', '.title']))
+            for _ in range(REORDER_INTERVAL):
+                stats.record('site', 'title_selectors', '.title', True)
+        self.assertIn(['.gone', '.title'], orders)
+        self.assertEqual(orders[0], ['.title', '.gone'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import asyncio
+import unittest
+
+import httpx
+
+from scrapers import BaseScraper
+from scrapers.selector_stats import SelectorStats
+
+SELECTORS = {
+    # The streamable primary no longer matches; the fallback has a combinator
+    'product_selectors': ['div.result', 'div.grid > .card'],
+    'title_selectors': ['h2'],
+}
+PAGE = ('<html><body><div class="grid">'
+        + ''.join(f'<div class="card"><h2>Item {i}</h2></div>' for i in range(3))
+        + '</div></body></html>').encode()
+
+
+class StubClientManager:
+    def __init__(self):
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, content=PAGE, headers={'content-type': 'text/html'})
+        ))
+
+    async def get_client(self, url):
+        return self.client
+
+
+class StreamProductsTest(unittest.TestCase):
+    def test_page_the_streamed_selector_misses_is_parsed_whole(self):
+        async def run():
+            manager = StubClientManager()
+            scraper = BaseScraper(client_manager=manager, selector_stats=SelectorStats(), stream_parse=True)
+            try:
+                return await scraper.page_products('https://example.com/s', SELECTORS, limit=None)
+            finally:
+                await manager.client.aclose()
+
+        products = asyncio.run(run())
+        self.assertEqual([p['title'] for p in products], ['Item 0', 'Item 1', 'Item 2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,6 +19,12 @@ export default defineConfig({
   },
 
   vite: {
-    plugins: [tailwindcss()]
+    plugins: [tailwindcss()],
+    // Exported thumbnail URLs are relative (/api/images); in dev the API runs on :8000
+    server: {
+      proxy: {
+        '/api': 'http://localhost:8000',
+      },
+    },
   }
 });
\ No newline at end of file
@@ -0,0 +1,10 @@
+// Prices in the record's own currency (exported records carry an ISO code;
+// older ones without it are USD), with the page locale's separators
+export function formatPrice(value: number, currency: string | undefined, lang: string) {
+  try {
+    return new Intl.NumberFormat(lang, { style: 'currency', currency: currency || 'USD' }).format(value);
+  } catch {
+    // Not an ISO 4217 code
+    return `${value.toFixed(2)} ${currency}`;
+  }
+}
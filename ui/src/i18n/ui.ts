@@ -24,6 +24,7 @@ export const ui = {
     'product.reviews': 'reviews',
     'product.notfound': 'No products found',
     'product.visit': 'Visit',
+    'product.loadMore': 'Load more',
     'product.shipping': 'Shipping',
     'product.outOfStock': 'Out of Stock',
     
@@ -79,6 +80,7 @@ export const ui = {
     'product.reviews': 'Bewertungen',
     'product.notfound': 'Keine Produkte gefunden',
     'product.visit': 'Besuchen',
+    'product.loadMore': 'Mehr laden',
     'product.shipping': 'Versand',
     'product.outOfStock': 'Nicht auf Lager',
     
@@ -134,6 +136,7 @@ export const ui = {
     'product.reviews': 'reseñas',
     'product.notfound': 'No se encontraron productos',
     'product.visit': 'Visitar',
+    'product.loadMore': 'Cargar más',
     'product.shipping': 'Envío',
     'product.outOfStock': 'Agotado',
     
@@ -189,6 +192,7 @@ export const ui = {
     'product.reviews': 'avis',
     'product.notfound': 'Aucun produit trouvé',
     'product.visit': 'Visiter',
+    'product.loadMore': 'Charger plus',
     'product.shipping': 'Livraison',
     'product.outOfStock': 'En rupture de stock',
     